@@ -1,6 +1,5 @@
 """Device Manager module for board allocation and control."""
 
-from .api import app
 from .models import Board, Lease, LeaseRequest, TestSubmission, TestResult
 from .config import load_boards_config, get_board_by_family, get_board_by_id, BoardsConfig
 
@@ -15,4 +14,13 @@ __all__ = [
     "load_boards_config",
     "get_board_by_family",
     "get_board_by_id"
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    # The FastAPI app is imported on first access so that using the models,
+    # config or manager does not pay for building the API route table
+    if name == "app":
+        from .api import app
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
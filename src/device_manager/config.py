@@ -3,21 +3,90 @@
 import os
 import yaml
 import logging
-from typing import List, Optional, Dict, Set
+import multiprocessing
+from typing import IO, List, Optional, Dict, Set, Union
 from pathlib import Path
-from pydantic import BaseModel, Field, ValidationError
-from collections import defaultdict
+from pydantic import BaseModel, Field, PrivateAttr, ValidationError
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
 
 from .models import Board
 
 logger = logging.getLogger(__name__)
 
+# Prefer the libyaml-backed C loader/dumper; fall back to pure Python
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+_YAML_DUMPER = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+# Health states accepted by update_board_health
+_VALID_HEALTH_STATUSES = frozenset({"healthy", "degraded", "unhealthy", "quarantined"})
+
+# Fields a board entry must have even when validation is skipped
+_REQUIRED_BOARD_FIELDS = frozenset(
+    name for name, field in Board.model_fields.items() if field.is_required()
+)
+
+# Parsed configs keyed by (resolved path, mtime_ns, size, validate); a changed
+# file gets a new key, so stale entries are simply never hit again
+_CONFIG_CACHE: Dict[tuple, "BoardsConfig"] = {}
+
+
+class _BoardIndex:
+    """Lookup tables over a boards list, keyed on fields that don't change at runtime."""
+    
+    def __init__(self, boards: List[Board]):
+        self.source = boards
+        self.size = len(boards)
+        self.by_id: Dict[str, Board] = {}
+        self.by_family: Dict[str, List[Board]] = defaultdict(list)
+        self.by_location: Dict[str, List[Board]] = defaultdict(list)
+        # Per family, healthy boards first, each group in file order
+        self.healthy_first: Dict[str, List[Board]] = {}
+        self._position: Dict[int, int] = {}
+        
+        for position, board in enumerate(boards):
+            # First board wins on duplicate IDs, matching a front-to-back scan
+            self.by_id.setdefault(board.board_id, board)
+            self.by_family[board.soc_family].append(board)
+            self.by_location[board.location].append(board)
+            self._position.setdefault(id(board), position)
+        
+        for family in self.by_family:
+            self.reorder_family(family)
+    
+    def _health_key(self, board: Board) -> tuple:
+        return (board.health_status != "healthy", self._position[id(board)])
+    
+    def reorder_family(self, family: str) -> None:
+        """Re-rank a family's boards after one of them changed health."""
+        self.healthy_first[family] = sorted(self.by_family.get(family, ()), key=self._health_key)
+
 
 class BoardsConfig(BaseModel):
     """Boards configuration container."""
     
     boards: List[Board] = Field(default_factory=list, description="List of boards")
     
+    # Health status changes at runtime: update_board_health/quarantine_board
+    # re-rank the affected family, and lookups still check health on the board
+    _index: Optional[_BoardIndex] = PrivateAttr(default=None)
+    
+    def index(self) -> _BoardIndex:
+        """
+        Get the lookup index for the current boards list.
+        
+        The index is rebuilt when `boards` is replaced or changes length;
+        call reindex() after editing board IDs, families or locations in place.
+        """
+        index = self._index
+        if index is None or index.source is not self.boards or index.size != len(self.boards):
+            index = self._index = _BoardIndex(self.boards)
+        return index
+    
+    def reindex(self) -> None:
+        """Drop the lookup index so it is rebuilt on next use."""
+        self._index = None
+    
     def validate_config(self) -> Dict[str, List[str]]:
         """
         Validate the configuration for consistency and completeness.
@@ -28,16 +97,16 @@ class BoardsConfig(BaseModel):
         issues = {"errors": [], "warnings": []}
         
         # Check for duplicate board IDs
-        board_ids = [board.board_id for board in self.boards]
-        duplicates = [id for id in board_ids if board_ids.count(id) > 1]
+        id_counts = Counter(board.board_id for board in self.boards)
+        duplicates = {board_id for board_id, count in id_counts.items() if count > 1}
         if duplicates:
-            issues["errors"].append(f"Duplicate board IDs found: {set(duplicates)}")
+            issues["errors"].append(f"Duplicate board IDs found: {duplicates}")
         
         # Check for duplicate IP:port combinations
-        endpoints = [(b.board_ip, b.telnet_port) for b in self.boards]
-        duplicate_endpoints = [ep for ep in endpoints if endpoints.count(ep) > 1]
+        endpoint_counts = Counter((b.board_ip, b.telnet_port) for b in self.boards)
+        duplicate_endpoints = {ep for ep, count in endpoint_counts.items() if count > 1}
         if duplicate_endpoints:
-            issues["warnings"].append(f"Duplicate endpoints (IP:port) found: {set(duplicate_endpoints)}")
+            issues["warnings"].append(f"Duplicate endpoints (IP:port) found: {duplicate_endpoints}")
         
         # Validate each board
         for board in self.boards:
@@ -49,7 +118,7 @@ class BoardsConfig(BaseModel):
     
     def get_boards_by_family(self, family: str) -> List[Board]:
         """Get all boards for a specific SoC family."""
-        return [b for b in self.boards if b.soc_family == family]
+        return list(self.index().by_family.get(family, ()))
     
     def get_healthy_boards(self) -> List[Board]:
         """Get all healthy boards."""
@@ -57,41 +126,47 @@ class BoardsConfig(BaseModel):
     
     def get_boards_by_location(self, location: str) -> List[Board]:
         """Get all boards at a specific location."""
-        return [b for b in self.boards if b.location == location]
+        return list(self.index().by_location.get(location, ()))
     
     def get_families(self) -> Set[str]:
         """Get set of all available SoC families."""
-        return set(b.soc_family for b in self.boards)
+        return set(self.index().by_family)
     
     def get_locations(self) -> Set[str]:
         """Get set of all locations."""
-        return set(b.location for b in self.boards)
+        return set(self.index().by_location)
     
     def summary(self) -> Dict:
         """Get configuration summary statistics."""
+        # Family/location groupings come from the index; only health needs a pass
+        index = self.index()
         return {
             "total_boards": len(self.boards),
-            "healthy_boards": len(self.get_healthy_boards()),
-            "families": list(self.get_families()),
-            "locations": list(self.get_locations()),
+            "healthy_boards": sum(1 for b in self.boards if b.health_status == "healthy"),
+            "families": list(index.by_family),
+            "locations": list(index.by_location),
             "boards_by_family": {
-                family: len(self.get_boards_by_family(family))
-                for family in self.get_families()
+                family: len(boards) for family, boards in index.by_family.items()
             },
             "boards_by_location": {
-                location: len(self.get_boards_by_location(location))
-                for location in self.get_locations()
+                location: len(boards) for location, boards in index.by_location.items()
             }
         }
 
 
-def load_boards_config(config_path: Optional[str] = None, validate: bool = True) -> BoardsConfig:
+def load_boards_config(
+    config_path: Union[str, os.PathLike, IO[str], None] = None,
+    validate: bool = True
+) -> BoardsConfig:
     """
     Load boards configuration from YAML file.
     
     Args:
-        config_path: Path to boards.yaml file
-        validate: Whether to validate the configuration
+        config_path: Path to boards.yaml file, or an open text stream with
+            the YAML content (streams are parsed directly and not cached)
+        validate: Whether to validate the configuration; when False, boards
+            are built with Board.model_construct (no type coercion) and
+            config-level checks are skipped
     
     Returns:
         BoardsConfig: Loaded configuration
@@ -101,6 +176,9 @@ def load_boards_config(config_path: Optional[str] = None, validate: bool = True)
         ValidationError: If configuration is invalid
         yaml.YAMLError: If YAML parsing fails
     """
+    if hasattr(config_path, "read"):
+        return _parse_boards_config(config_path, validate, source="stream")
+    
     if config_path is None:
         config_path = os.getenv("BOARDS_CONFIG_PATH", "/app/config/boards.yaml")
     
@@ -117,10 +195,36 @@ def load_boards_config(config_path: Optional[str] = None, validate: bool = True)
             logger.warning("No configuration file found, using empty config")
             return BoardsConfig()
     
+    stat = config_file.stat()
+    cache_key = (str(config_file.resolve()), stat.st_mtime_ns, stat.st_size, validate)
+    cached = _CONFIG_CACHE.get(cache_key)
+    if cached is not None:
+        logger.debug(f"Using cached configuration for {config_file}")
+        # Callers update board health in place; hand each one its own boards
+        return cached.model_copy(deep=True)
+    
+    with open(config_file, 'r') as f:
+        config = _parse_boards_config(f, validate, source=str(config_file))
+    
+    _CONFIG_CACHE[cache_key] = config.model_copy(deep=True)
+    return config
+
+
+def _parse_boards_config(stream: IO[str], validate: bool, source: str) -> BoardsConfig:
+    """
+    Parse and optionally validate boards configuration YAML.
+    
+    Args:
+        stream: Text stream with the YAML content
+        validate: Whether to validate the configuration
+        source: Where the content came from, for log messages
+    
+    Returns:
+        BoardsConfig: Parsed configuration
+    """
     try:
-        with open(config_file, 'r') as f:
-            data = yaml.safe_load(f)
-            
+        data = yaml.load(stream, Loader=_YAML_LOADER)
+        
         if not data:
             logger.warning("Configuration file is empty")
             return BoardsConfig()
@@ -129,7 +233,9 @@ def load_boards_config(config_path: Optional[str] = None, validate: bool = True)
             logger.error("Configuration missing 'boards' key")
             return BoardsConfig()
         
-        # Parse boards with validation
+        # Parse boards; without validation, skip pydantic's field validators
+        # and only drop entries that are missing required fields
+        make_board = Board if validate else Board.model_construct
         boards = []
         errors = []
         for idx, board_data in enumerate(data['boards']):
@@ -137,10 +243,15 @@ def load_boards_config(config_path: Optional[str] = None, validate: bool = True)
                 # Add default health_status if missing
                 if 'health_status' not in board_data:
                     board_data['health_status'] = 'healthy'
+                
+                if not validate:
+                    missing = _REQUIRED_BOARD_FIELDS.difference(board_data)
+                    if missing:
+                        raise ValueError(f"missing required fields: {sorted(missing)}")
                     
-                board = Board(**board_data)
+                board = make_board(**board_data)
                 boards.append(board)
-            except ValidationError as e:
+            except (ValidationError, ValueError) as e:
                 errors.append(f"Board {idx} ({board_data.get('board_id', 'unknown')}): {e}")
                 logger.error(f"Failed to parse board {idx}: {e}")
         
@@ -151,19 +262,9 @@ def load_boards_config(config_path: Optional[str] = None, validate: bool = True)
         
         # Validate configuration if requested
         if validate:
-            issues = config.validate_config()
-            
-            # Log warnings
-            for warning in issues["warnings"]:
-                logger.warning(f"Config validation warning: {warning}")
-            
-            # Raise on errors
-            if issues["errors"]:
-                error_msg = "Configuration errors found:\n" + "\n".join(issues["errors"])
-                logger.error(error_msg)
-                raise ValueError(error_msg)
+            _check_config(config)
         
-        logger.info(f"Loaded {len(boards)} boards from {config_file}")
+        logger.info(f"Loaded {len(boards)} boards from {source}")
         logger.info(f"Configuration summary: {config.summary()}")
         
         return config
@@ -176,6 +277,129 @@ def load_boards_config(config_path: Optional[str] = None, validate: bool = True)
         raise
 
 
+def _check_config(config: BoardsConfig) -> None:
+    """
+    Run config-level validation, logging warnings and raising on errors.
+    
+    Raises:
+        ValueError: If the configuration has errors
+    """
+    issues = config.validate_config()
+    
+    # Log warnings
+    for warning in issues["warnings"]:
+        logger.warning(f"Config validation warning: {warning}")
+    
+    # Raise on errors
+    if issues["errors"]:
+        error_msg = "Configuration errors found:\n" + "\n".join(issues["errors"])
+        logger.error(error_msg)
+        raise ValueError(error_msg)
+
+
+def load_boards_configs(
+    config_paths: List[str],
+    validate: bool = True,
+    max_workers: Optional[int] = None
+) -> BoardsConfig:
+    """
+    Load several boards configuration files (e.g. one per rack) and merge them.
+    
+    Parsing and validation are CPU-bound, so multiple files are loaded in
+    parallel worker processes rather than threads.
+    
+    Args:
+        config_paths: Paths to boards YAML files
+        validate: Whether to validate each file and the merged configuration
+        max_workers: Worker process count (defaults to the CPU count)
+    
+    Returns:
+        BoardsConfig: Boards from all files, in the order the paths were given
+        
+    Raises:
+        ValueError: If validation fails, including duplicates across files
+    """
+    if len(config_paths) <= 1:
+        parts = [load_boards_config(path, validate) for path in config_paths]
+    else:
+        # Spawn the workers: forking a process that already runs threads
+        # (the event loop's executors, Redis clients) can deadlock the child
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            parts = list(executor.map(load_boards_config, config_paths, [validate] * len(config_paths)))
+    
+    config = BoardsConfig(boards=[board for part in parts for board in part.boards])
+    
+    # Each file was checked on its own; duplicates may still span files
+    if validate:
+        _check_config(config)
+    
+    logger.info(f"Loaded {len(config.boards)} boards from {len(config_paths)} files")
+    return config
+
+
+def list_board_ids(config_path: Union[str, os.PathLike, IO[str]]) -> List[str]:
+    """
+    Read just the board IDs from a boards configuration.
+    
+    Walks the YAML event stream instead of loading the document, so no
+    intermediate dicts or Board objects are built and nothing is validated.
+    
+    Args:
+        config_path: Path to boards.yaml file, or an open text stream
+    
+    Returns:
+        Board IDs in file order
+        
+    Raises:
+        FileNotFoundError: If config file doesn't exist
+        yaml.YAMLError: If YAML parsing fails
+    """
+    if not hasattr(config_path, "read"):
+        with open(config_path, 'r') as f:
+            return list_board_ids(f)
+    
+    board_ids = []
+    # One [is_mapping, expecting_key, current_key] entry per open container
+    stack = []
+    
+    def value_done():
+        if stack and stack[-1][0]:
+            stack[-1][1] = True
+    
+    for event in yaml.parse(config_path, Loader=_YAML_LOADER):
+        if isinstance(event, (yaml.MappingStartEvent, yaml.SequenceStartEvent)):
+            stack.append([isinstance(event, yaml.MappingStartEvent), True, None])
+        elif isinstance(event, (yaml.MappingEndEvent, yaml.SequenceEndEvent)):
+            stack.pop()
+            value_done()
+        elif isinstance(event, yaml.ScalarEvent) and stack:
+            top = stack[-1]
+            if top[0] and top[1]:
+                top[1], top[2] = False, event.value
+                continue
+            # Value of boards[*].board_id: root mapping -> sequence -> board mapping
+            if (
+                len(stack) == 3
+                and top[2] == "board_id"
+                and stack[0][2] == "boards"
+                and not stack[1][0]
+            ):
+                board_ids.append(event.value)
+            value_done()
+        elif isinstance(event, yaml.AliasEvent):
+            value_done()
+    
+    return board_ids
+
+
+def clear_config_cache() -> None:
+    """Drop all cached configurations so the next load re-reads the file."""
+    _CONFIG_CACHE.clear()
+
+
 def get_board_by_family(config: BoardsConfig, family: str) -> Optional[Board]:
     """
     Get first available board from a specific family.
@@ -187,8 +411,10 @@ def get_board_by_family(config: BoardsConfig, family: str) -> Optional[Board]:
     Returns:
         Board or None if not found
     """
-    for board in config.boards:
-        if board.soc_family == family and board.health_status == "healthy":
+    # Healthy boards are ranked first, so this normally stops at index 0;
+    # the check still guards against health set outside update_board_health
+    for board in config.index().healthy_first.get(family, ()):
+        if board.health_status == "healthy":
             return board
     return None
 
@@ -204,10 +430,7 @@ def get_board_by_id(config: BoardsConfig, board_id: str) -> Optional[Board]:
     Returns:
         Board or None if not found
     """
-    for board in config.boards:
-        if board.board_id == board_id:
-            return board
-    return None
+    return config.index().by_id.get(board_id)
 
 
 def save_boards_config(config: BoardsConfig, config_path: Optional[str] = None) -> None:
@@ -233,12 +456,12 @@ def save_boards_config(config: BoardsConfig, config_path: Optional[str] = None)
     
     # Write YAML file
     with open(config_file, 'w') as f:
-        yaml.dump(data, f, default_flow_style=False, sort_keys=False)
+        yaml.dump(data, f, Dumper=_YAML_DUMPER, default_flow_style=False, sort_keys=False)
     
     logger.info(f"Saved configuration with {len(config.boards)} boards to {config_file}")
 
 
-def update_board_health(config: BoardsConfig, board_id: str, health_status: str) -> bool:
+def update_board_health(config: BoardsConfig, board_id: str, health_status: str) -> Optional[Board]:
     """
     Update the health status of a board.
     
@@ -248,24 +471,24 @@ def update_board_health(config: BoardsConfig, board_id: str, health_status: str)
         health_status: New health status (healthy, degraded, unhealthy, quarantined)
     
     Returns:
-        True if updated, False if board not found
+        The updated Board, or None if the status is invalid or the board not found
     """
-    valid_statuses = ["healthy", "degraded", "unhealthy", "quarantined"]
-    if health_status not in valid_statuses:
-        logger.error(f"Invalid health status: {health_status}. Must be one of {valid_statuses}")
-        return False
+    if health_status not in _VALID_HEALTH_STATUSES:
+        logger.error(f"Invalid health status: {health_status}. Must be one of {sorted(_VALID_HEALTH_STATUSES)}")
+        return None
     
     board = get_board_by_id(config, board_id)
     if board:
         board.health_status = health_status
+        config.index().reorder_family(board.soc_family)
         logger.info(f"Updated board {board_id} health status to {health_status}")
-        return True
+        return board
     
     logger.warning(f"Board {board_id} not found in configuration")
-    return False
+    return None
 
 
-def quarantine_board(config: BoardsConfig, board_id: str, reason: str = "") -> bool:
+def quarantine_board(config: BoardsConfig, board_id: str, reason: str = "") -> Optional[Board]:
     """
     Quarantine a board (set health to quarantined and increment failure count).
     
@@ -275,17 +498,18 @@ def quarantine_board(config: BoardsConfig, board_id: str, reason: str = "") -> b
         reason: Optional reason for quarantine
     
     Returns:
-        True if quarantined, False if board not found
+        The quarantined Board, or None if board not found
     """
     board = get_board_by_id(config, board_id)
     if board:
         board.health_status = "quarantined"
         board.failure_count += 1
+        config.index().reorder_family(board.soc_family)
         logger.warning(f"Quarantined board {board_id}. Failure count: {board.failure_count}. Reason: {reason}")
-        return True
+        return board
     
     logger.error(f"Cannot quarantine: Board {board_id} not found")
-    return False
+    return None
 
 
 def get_available_boards(config: BoardsConfig, family: Optional[str] = None) -> List[Board]:
@@ -299,9 +523,7 @@ def get_available_boards(config: BoardsConfig, family: Optional[str] = None) ->
     Returns:
         List of available boards
     """
-    boards = config.get_healthy_boards()
-    
     if family:
-        boards = [b for b in boards if b.soc_family == family]
+        return [b for b in config.index().by_family.get(family, ()) if b.health_status == "healthy"]
     
-    return boards
\ No newline at end of file
+    return config.get_healthy_boards()
\ No newline at end of file
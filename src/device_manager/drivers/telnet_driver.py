@@ -32,7 +32,7 @@ class ConnectionState(Enum):
     ERROR = "error"
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class TelnetConfig:
     """Telnet connection configuration."""
     host: str
@@ -76,6 +76,8 @@ class TelnetDriver:
         self.state = ConnectionState.DISCONNECTED
         self._output_buffer: List[str] = []
         self._command_history: List[Tuple[str, str]] = []  # (command, output) pairs
+        # Compiled once; every command matches the prompt at least twice
+        self._prompt_re = re.compile(config.shell_prompt)
         
         logger.info(f"TelnetDriver initialized for {config.host}:{config.port}")
     
@@ -158,7 +160,7 @@ class TelnetDriver:
             
             # Wait for shell prompt
             output = await self._read_until_regex(
-                self.config.shell_prompt,
+                self._prompt_re,
                 timeout=self.config.timeout
             )
             
@@ -207,7 +209,7 @@ class TelnetDriver:
             # Read output until prompt or timeout
             if expect_prompt:
                 output = await self._read_until_regex(
-                    self.config.shell_prompt,
+                    self._prompt_re,
                     timeout=timeout
                 )
             else:
@@ -221,7 +223,7 @@ class TelnetDriver:
             lines = output.split('\n')
             if lines and command in lines[0]:
                 lines = lines[1:]  # Remove command echo
-            if expect_prompt and lines and re.search(self.config.shell_prompt, lines[-1]):
+            if expect_prompt and lines and self._prompt_re.search(lines[-1]):
                 lines = lines[:-1]  # Remove prompt
             
             result = '\n'.join(lines).strip()
@@ -414,7 +416,7 @@ class TelnetDriver:
         
         raise asyncio.TimeoutError(f"Pattern '{pattern}' not found within {timeout} seconds")
     
-    async def _read_until_regex(self, pattern: str, timeout: int) -> str:
+    async def _read_until_regex(self, pattern: Union[str, re.Pattern], timeout: int) -> str:
         """Read until regex pattern matches."""
         if not self.reader:
             raise TelnetConnectionError("Not connected")
@@ -441,7 +443,7 @@ class TelnetDriver:
             except asyncio.TimeoutError:
                 continue
         
-        raise asyncio.TimeoutError(f"Regex pattern '{pattern}' not matched within {timeout} seconds")
+        raise asyncio.TimeoutError(f"Regex pattern '{regex.pattern}' not matched within {timeout} seconds")
     
     async def _read_with_timeout(self, timeout: int) -> str:
         """Read all available data within timeout."""
@@ -7,6 +7,7 @@ atomic board allocation across multiple workers and API instances.
 
 import asyncio
 import logging
+import time
 import uuid
 from contextlib import asynccontextmanager
 from datetime import timedelta
@@ -17,6 +18,29 @@ from redis.exceptions import RedisError, LockError, LockNotOwnedError
 
 logger = logging.getLogger(__name__)
 
+# Clock used for blocking-acquire deadlines; tests may swap in a virtual clock
+time_source = time.monotonic
+
+# Lua script for atomic set-if-absent with millisecond expiry
+# KEYS[1] = lock key, ARGV[1] = token, ARGV[2] = TTL in milliseconds
+ACQUIRE_LOCK_SCRIPT = """
+if redis.call("set", KEYS[1], ARGV[1], "NX", "PX", ARGV[2]) then
+    return 1
+else
+    return 0
+end
+"""
+
+# Lua script for atomic check-and-delete (only the owner may release)
+# KEYS[1] = lock key, ARGV[1] = token
+RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+else
+    return 0
+end
+"""
+
 
 class DistributedLockManager:
     """
@@ -47,6 +71,8 @@ class DistributedLockManager:
         self.blocking_timeout = blocking_timeout
         self.retry_interval = retry_interval
         self._local_locks = {}  # Track locks owned by this instance
+        self._acquire_script = None  # Registered lazily on first use
+        self._release_script = None  # Registered lazily on first use
 
     async def acquire_lock(
         self,
@@ -87,10 +113,10 @@ class DistributedLockManager:
             
             # If blocking, retry until timeout
             if blocking:
-                elapsed = 0
-                while elapsed < self.blocking_timeout:
+                start = time_source()
+                deadline = start + self.blocking_timeout
+                while time_source() < deadline:
                     await asyncio.sleep(self.retry_interval)
-                    elapsed += self.retry_interval
                     
                     acquired = await self.redis.set(
                         lock_key,
@@ -101,6 +127,7 @@ class DistributedLockManager:
                     
                     if acquired:
                         self._local_locks[resource_id] = lock_token
+                        elapsed = time_source() - start
                         logger.debug(f"Lock acquired for {resource_id} after {elapsed:.1f}s")
                         return lock_token
                 
@@ -112,6 +139,119 @@ class DistributedLockManager:
             logger.error(f"Redis error acquiring lock for {resource_id}: {e}")
             return None
 
+    async def acquire_lock_many(
+        self,
+        resource_ids: list[str],
+        timeout: Optional[int] = None
+    ) -> dict[str, str]:
+        """
+        Try to acquire locks for several resources in a single round trip.
+        
+        Each lock is attempted independently (non-blocking) with SET NX; the
+        commands are pipelined so the cost is one network round trip rather
+        than one per resource.
+        
+        Args:
+            resource_ids: Resource identifiers to lock
+            timeout: Lock expiration time in seconds (defaults to self.default_timeout)
+            
+        Returns:
+            Dictionary of resource_id -> token for the locks that were acquired
+        """
+        timeout = timeout or self.default_timeout
+        tokens = {resource_id: str(uuid.uuid4()) for resource_id in resource_ids}
+        
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for resource_id, token in tokens.items():
+                pipe.set(f"lock:board:{resource_id}", token, nx=True, ex=timeout)
+            results = await pipe.execute()
+        except RedisError as e:
+            logger.error(f"Redis error acquiring locks for {resource_ids}: {e}")
+            return {}
+        
+        acquired = {}
+        for (resource_id, token), ok in zip(tokens.items(), results, strict=True):
+            if ok:
+                self._local_locks[resource_id] = token
+                acquired[resource_id] = token
+        
+        logger.debug(f"Acquired {len(acquired)}/{len(tokens)} locks in one round trip")
+        return acquired
+
+    async def acquire_lock_batch(
+        self,
+        resource_ids: list[str],
+        timeout: Optional[int] = None
+    ) -> Optional[dict[str, str]]:
+        """
+        Acquire locks for all of several resources, or none of them.
+        
+        All SET NX commands go out in one pipelined round trip; if any
+        resource is already locked, the locks that were taken are handed
+        back with one pipelined release.
+        
+        Args:
+            resource_ids: Resource identifiers to lock
+            timeout: Lock expiration time in seconds (defaults to self.default_timeout)
+            
+        Returns:
+            Dictionary of resource_id -> token if every lock was acquired, None otherwise
+        """
+        acquired = await self.acquire_lock_many(resource_ids, timeout)
+        if len(acquired) == len(set(resource_ids)):
+            return acquired
+        
+        if acquired:
+            await self.release_lock_batch(acquired)
+        logger.debug(f"Batch lock failed: {len(acquired)}/{len(set(resource_ids))} resources available")
+        return None
+
+    async def acquire_lock_attempts(
+        self,
+        resource_id: str,
+        tokens: list[str],
+        timeout: Optional[int] = None
+    ) -> Optional[str]:
+        """
+        Submit several competing acquisition attempts in a single round trip.
+        
+        Each token is tried in order through the acquire script; all attempts
+        are pipelined, so contention is resolved by Redis without one network
+        round trip per contender.
+        
+        Args:
+            resource_id: Unique identifier for the resource
+            tokens: Candidate lock tokens, one per contender
+            timeout: Lock expiration time in seconds (defaults to self.default_timeout)
+            
+        Returns:
+            The winning token if any attempt acquired the lock, None otherwise
+        """
+        lock_key = f"lock:board:{resource_id}"
+        timeout_ms = (timeout or self.default_timeout) * 1000
+        
+        if self._acquire_script is None:
+            self._acquire_script = self.redis.register_script(ACQUIRE_LOCK_SCRIPT)
+        
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for token in tokens:
+                await self._acquire_script(keys=[lock_key], args=[token, timeout_ms], client=pipe)
+            results = await pipe.execute()
+            
+            for token, acquired in zip(tokens, results, strict=True):
+                if acquired:
+                    self._local_locks[resource_id] = token
+                    logger.debug(f"Lock acquired for {resource_id} with token {token}")
+                    return token
+            
+            return None
+            
+        except RedisError as e:
+            logger.error(f"Redis error acquiring lock for {resource_id}: {e}")
+            return None
+
     async def release_lock(
         self,
         resource_id: str,
@@ -129,18 +269,9 @@ class DistributedLockManager:
         """
         lock_key = f"lock:board:{resource_id}"
         
-        # Lua script for atomic check-and-delete
-        # This ensures we only delete the lock if we own it
-        lua_script = """
-        if redis.call("get", KEYS[1]) == ARGV[1] then
-            return redis.call("del", KEYS[1])
-        else
-            return 0
-        end
-        """
-        
         try:
-            result = await self.redis.eval(lua_script, 1, lock_key, token)
+            # Atomic check-and-delete: only delete the lock if we own it
+            result = await self.redis.eval(RELEASE_LOCK_SCRIPT, 1, lock_key, token)
             
             if result:
                 # Remove from local tracking
@@ -155,6 +286,42 @@ class DistributedLockManager:
             logger.error(f"Redis error releasing lock for {resource_id}: {e}")
             return False
 
+    async def release_lock_batch(self, locks: dict[str, str]) -> dict[str, bool]:
+        """
+        Release several locks in a single round trip.
+        
+        Each release runs the same owner-checked script as release_lock;
+        the script calls are pipelined rather than sent one at a time.
+        
+        Args:
+            locks: Dictionary of resource_id -> token
+            
+        Returns:
+            Dictionary of resource_id -> True if that lock was released
+        """
+        if not locks:
+            return {}
+        
+        if self._release_script is None:
+            self._release_script = self.redis.register_script(RELEASE_LOCK_SCRIPT)
+        
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for resource_id, token in locks.items():
+                await self._release_script(keys=[f"lock:board:{resource_id}"], args=[token], client=pipe)
+            results = await pipe.execute()
+        except RedisError as e:
+            logger.error(f"Redis error releasing locks for {list(locks)}: {e}")
+            return {resource_id: False for resource_id in locks}
+        
+        released = {}
+        for resource_id, result in zip(locks, results, strict=True):
+            released[resource_id] = bool(result)
+            if result:
+                self._local_locks.pop(resource_id, None)
+        
+        return released
+
     async def extend_lock(
         self,
         resource_id: str,
@@ -235,19 +402,20 @@ class DistributedLockManager:
         lock_key = f"lock:board:{resource_id}"
         
         try:
-            # Get lock token and TTL
-            token = await self.redis.get(lock_key)
+            # Get lock token and TTL in one round trip (MULTI keeps them consistent)
+            pipe = self.redis.pipeline()
+            pipe.get(lock_key)
+            pipe.ttl(lock_key)
+            token, ttl = await pipe.execute()
             if not token:
                 return None
-                
-            ttl = await self.redis.ttl(lock_key)
             
+            token = token.decode() if isinstance(token, bytes) else token
             return {
                 "resource_id": resource_id,
-                "token": token.decode() if isinstance(token, bytes) else token,
+                "token": token,
                 "ttl": ttl,
-                "is_owner": resource_id in self._local_locks and 
-                           self._local_locks[resource_id] == (token.decode() if isinstance(token, bytes) else token)
+                "is_owner": self._local_locks.get(resource_id) == token
             }
             
         except RedisError as e:
@@ -365,6 +533,9 @@ class MultiResourceLockManager(DistributedLockManager):
         """
         Acquire locks for multiple resources atomically.
         
+        Each attempt is one pipelined all-or-nothing batch (see
+        acquire_lock_batch), so no lock is held while waiting on another.
+        
         Args:
             resource_ids: List of resource identifiers
             timeout: Lock expiration time in seconds
@@ -373,28 +544,24 @@ class MultiResourceLockManager(DistributedLockManager):
         Returns:
             Dictionary of resource_id -> token if all acquired, None if any failed
         """
-        acquired_locks = {}
-        
-        try:
-            # Try to acquire all locks
-            for resource_id in resource_ids:
-                token = await self.acquire_lock(resource_id, timeout, blocking)
-                if token:
-                    acquired_locks[resource_id] = token
-                else:
-                    # Failed to acquire one lock, release all acquired
-                    for rid, tok in acquired_locks.items():
-                        await self.release_lock(rid, tok)
-                    return None
-            
+        acquired_locks = await self.acquire_lock_batch(resource_ids, timeout)
+        if acquired_locks is not None or not blocking:
             return acquired_locks
+        
+        # Retry the whole batch until timeout
+        start = time_source()
+        deadline = start + self.blocking_timeout
+        while time_source() < deadline:
+            await asyncio.sleep(self.retry_interval)
             
-        except Exception as e:
-            # On any error, release all acquired locks
-            logger.error(f"Error acquiring multiple locks: {e}")
-            for rid, tok in acquired_locks.items():
-                await self.release_lock(rid, tok)
-            return None
+            acquired_locks = await self.acquire_lock_batch(resource_ids, timeout)
+            if acquired_locks is not None:
+                elapsed = time_source() - start
+                logger.debug(f"Locks acquired for {resource_ids} after {elapsed:.1f}s")
+                return acquired_locks
+        
+        logger.warning(f"Failed to acquire locks for {resource_ids} after {self.blocking_timeout}s")
+        return None
 
     async def release_multiple_locks(
         self,
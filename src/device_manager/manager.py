@@ -1,10 +1,11 @@
 """Core device manager for board allocation and leasing."""
 
+import json
 import uuid
 import logging
 from datetime import datetime, timedelta
 from typing import List, Optional, Dict, Any
-from enum import Enum
+from enum import Enum, StrEnum
 
 from .models import Board, Lease, LeaseRequest
 from .config import (
@@ -17,10 +18,29 @@ from .config import (
 from .lock_manager import DistributedLockManager
 from .redis_client import RedisClient
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; the stdlib encodes the same payloads
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+# Lease (de)serialization. orjson returns bytes, which Redis stores as-is;
+# both loads accept the str or bytes the client hands back.
+if orjson is not None:
+    _dump_lease = orjson.dumps
+    _load_lease = orjson.loads
+else:
+    _dump_lease = json.dumps
+    _load_lease = json.loads
+
+# SCAN batch size for lease keys. Large enough that a typical fleet's leases
+# come back in one round trip; the cursor loop still covers bigger keyspaces
+# and partial batches, which SCAN may return at any size.
+LEASE_SCAN_COUNT = 1000
+
 
-class LeaseStatus(Enum):
+class LeaseStatus(StrEnum):
     """Lease status enumeration."""
     ACTIVE = "active"
     EXPIRED = "expired"
@@ -405,7 +425,6 @@ class DeviceManager:
     
     async def _store_lease(self, lease: Lease) -> None:
         """Store lease in Redis."""
-        import json
         client = await self.redis_client.get_client()
         lease_key = f"lease:{lease.lease_id}"
         lease_data = {
@@ -423,11 +442,10 @@ class DeviceManager:
         # Calculate TTL based on expiration
         ttl = int((lease.expires_at - datetime.now()).total_seconds())
         if ttl > 0:
-            await client.set(lease_key, json.dumps(lease_data), ex=ttl)
+            await client.set(lease_key, _dump_lease(lease_data), ex=ttl)
     
     async def _get_lease(self, lease_id: str) -> Optional[Lease]:
         """Get lease from Redis."""
-        import json
         client = await self.redis_client.get_client()
         lease_key = f"lease:{lease_id}"
         lease_data = await client.get(lease_key)
@@ -435,7 +453,7 @@ class DeviceManager:
         if not lease_data:
             return None
         
-        data = json.loads(lease_data)
+        data = _load_lease(lease_data)
         return Lease(
             lease_id=data["lease_id"],
             board_id=data["board_id"],
@@ -464,14 +482,13 @@ class DeviceManager:
             cursor, keys = await client.scan(
                 cursor=cursor,
                 match="lease:*",
-                count=100
+                count=LEASE_SCAN_COUNT
             )
             
             for key in keys:
                 lease_data = await client.get(key)
                 if lease_data:
-                    import json
-                    data = json.loads(lease_data)
+                    data = _load_lease(lease_data)
                     if data["board_id"] == board_id:
                         lease_id = key.split(":")[-1]
                         return await self._get_lease(lease_id)
@@ -491,7 +508,7 @@ class DeviceManager:
             cursor, keys = await client.scan(
                 cursor=cursor,
                 match="lease:*",
-                count=100
+                count=LEASE_SCAN_COUNT
             )
             count += len(keys)
             
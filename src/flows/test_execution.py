@@ -1,7 +1,10 @@
 """Test execution flow for SoC validation."""
 
 from prefect import flow, get_run_logger
-from typing import Optional
+from typing import List, Optional
+import asyncio
+
+from src.tasks.test_tasks import transfer_test_binary, execute_test
 
 
 @flow(name="test-execution")
@@ -38,4 +41,44 @@ async def test_execution_flow(
         "message": "Test execution flow initialized"
     }
     
-    return result
\ No newline at end of file
+    return result
+
+
+async def _run_on_board(board_id: str, test_binary: str, timeout: int) -> dict:
+    """Transfer and execute a test binary on a single board."""
+    if not await transfer_test_binary(board_id, test_binary):
+        return {
+            "status": "failed",
+            "board_id": board_id,
+            "test_binary": test_binary,
+            "error_message": "Test binary transfer failed"
+        }
+    return await execute_test(board_id, test_binary, timeout)
+
+
+@flow(name="multi-board-test-execution")
+async def multi_board_test_flow(
+    test_binary: str,
+    board_ids: List[str],
+    timeout: int = 1800
+) -> List[dict]:
+    """
+    Run the same test binary on several boards concurrently.
+    
+    Args:
+        test_binary: Path to the test binary to execute
+        board_ids: Boards to run the test on
+        timeout: Test timeout in seconds (default 30 minutes)
+    
+    Returns:
+        list: One test execution result per board, in board_ids order
+    """
+    logger = get_run_logger()
+    logger.info("Running %s on %d boards", test_binary, len(board_ids))
+    
+    # Boards are independent, so run them together; wall time is the slowest board
+    results = await asyncio.gather(
+        *(_run_on_board(board_id, test_binary, timeout) for board_id in board_ids)
+    )
+    
+    return list(results)
@@ -1,16 +1,15 @@
 """Notification Service API."""
 
 import os
-from typing import Optional
-from fastapi import FastAPI, HTTPException, Request
+from typing import Any, Callable, Optional
+from fastapi import BackgroundTasks, FastAPI, HTTPException, Request
 from pydantic import BaseModel
+import anyio
 import httpx
 import logging
 
 from .notifier import NotificationService
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Create FastAPI app
@@ -23,6 +22,28 @@ app = FastAPI(
 # Initialize notification service
 notification_service = NotificationService()
 
+# Bounded thread pool for blocking work kicked off by webhook handlers
+_WEBHOOK_LIMITER = anyio.CapacityLimiter(16)
+
+
+def trigger_prefect_deployment(text: str, user: str) -> None:
+    """
+    Trigger a test run for a Slack /run-test request.
+    
+    This is synchronous and may block, so it must be run off the event loop.
+    
+    Args:
+        text: Command text (test selection)
+        user: Requesting Slack user name
+    """
+    # TODO: Implement Prefect deployment trigger
+    logger.info("Test run requested by %s: %s", user, text)
+
+
+async def _run_in_thread(func: Callable[..., None], *args: Any) -> None:
+    """Run a blocking callable in the bounded webhook thread pool."""
+    await anyio.to_thread.run_sync(func, *args, limiter=_WEBHOOK_LIMITER)
+
 
 class HealthResponse(BaseModel):
     """Health check response."""
@@ -76,7 +97,7 @@ async def notify_test_result(notification: TestNotification):
             return {"status": "skipped", "message": "Notifications not configured or disabled"}
             
     except Exception as e:
-        logger.error(f"Failed to send notification: {e}")
+        logger.error("Failed to send notification: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -92,12 +113,29 @@ async def notify_queue_alert(queue_size: int = 0, wait_time: float = 0.0):
             return {"status": "skipped", "message": "Alert threshold not met or notifications disabled"}
             
     except Exception as e:
-        logger.error(f"Failed to send queue alert: {e}")
+        logger.error("Failed to send queue alert: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _handle_run_test(text: str, user: str, background_tasks: BackgroundTasks) -> dict:
+    """Handle the Slack /run-test slash command."""
+    # Trigger a test run via Prefect after responding, so Slack
+    # gets its reply without waiting on the deployment trigger
+    background_tasks.add_task(_run_in_thread, trigger_prefect_deployment, text, user)
+    return {
+        "response_type": "in_channel",
+        "text": f"Test requested by @{user} for: {text}"
+    }
+
+
+# Slack slash command -> handler(text, user, background_tasks)
+_SLACK_COMMANDS = {
+    "/run-test": _handle_run_test,
+}
+
+
 @app.post("/webhooks/slack")
-async def slack_webhook(request: Request):
+async def slack_webhook(request: Request, background_tasks: BackgroundTasks):
     """Handle Slack webhook events and commands."""
     try:
         # Get the raw body for signature verification
@@ -117,18 +155,13 @@ async def slack_webhook(request: Request):
             text = payload.get("text", "")
             user = payload.get("user_name", "unknown")
             
-            if command == "/run-test":
-                # Trigger a test run via Prefect
-                # TODO: Implement Prefect deployment trigger
-                return {
-                    "response_type": "in_channel",
-                    "text": f"Test requested by @{user} for: {text}"
-                }
-            else:
+            handler = _SLACK_COMMANDS.get(command)
+            if handler is None:
                 return {
                     "response_type": "ephemeral",
                     "text": f"Unknown command: {command}"
                 }
+            return handler(text, user, background_tasks)
                 
         elif "event" in payload:
             # Event callback
@@ -136,14 +169,14 @@ async def slack_webhook(request: Request):
             event_type = event.get("type")
             
             # Handle different event types
-            logger.info(f"Received Slack event: {event_type}")
+            logger.info("Received Slack event: %s", event_type)
             return {"ok": True}
             
         else:
             return {"ok": True}
             
     except Exception as e:
-        logger.error(f"Slack webhook error: {e}")
+        logger.error("Slack webhook error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -161,16 +194,18 @@ async def feishu_webhook(request: Request):
         
         if event_type == "im.message.receive_v1":
             # Handle message
-            message = payload.get("event", {}).get("message", {})
-            content = message.get("content", "")
-            
             # TODO: Parse and handle commands
-            logger.info(f"Received Feishu message: {content}")
+            
+            # Only dig the content out of the payload when it will be logged
+            if logger.isEnabledFor(logging.INFO):
+                message = payload.get("event", {}).get("message", {})
+                content = message.get("content", "")
+                logger.info("Received Feishu message: %s", content)
             
         return {"msg": "ok"}
         
     except Exception as e:
-        logger.error(f"Feishu webhook error: {e}")
+        logger.error("Feishu webhook error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -189,27 +224,34 @@ async def jenkins_webhook(request: Request):
         
         if build_status:
             # TODO: Trigger appropriate test workflows
-            logger.info(f"Jenkins build {build_status}: {build_url}")
+            logger.info("Jenkins build %s: %s", build_status, build_url)
             
         return {"status": "received"}
         
     except Exception as e:
-        logger.error(f"Jenkins webhook error: {e}")
+        logger.error("Jenkins webhook error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def configure_logging(level: int = logging.INFO) -> None:
+    """Configure root logging for the notification service process."""
+    logging.basicConfig(level=level)
+
+
 @app.on_event("startup")
 async def startup_event():
     """Startup event handler."""
+    configure_logging()
     logger.info("Notification Service starting up...")
-    logger.info(f"Slack webhook configured: {notification_service.slack_webhook is not None}")
-    logger.info(f"Feishu webhook configured: {notification_service.feishu_webhook is not None}")
+    logger.info("Slack webhook configured: %s", notification_service.slack_webhook is not None)
+    logger.info("Feishu webhook configured: %s", notification_service.feishu_webhook is not None)
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Shutdown event handler."""
     logger.info("Notification Service shutting down...")
+    await notification_service.close()
 
 
 if __name__ == "__main__":
@@ -8,16 +8,36 @@ from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+# Status -> emoji used in notification headers (anything else is a timeout/unknown)
+_EMOJI = {"passed": "✅", "failed": "❌"}
+
 
 class NotificationService:
     """Service for sending notifications to Slack/Feishu."""
     
-    def __init__(self):
-        """Initialize notification service with webhooks from environment."""
+    def __init__(self, http_client: Optional[httpx.AsyncClient] = None):
+        """
+        Initialize notification service with webhooks from environment.
+        
+        Args:
+            http_client: Client to post webhooks through; owned by the caller.
+                When omitted, the service opens one on first use and keeps it
+                (and its pooled connections) until close()
+        """
+        self._http_client = http_client
+        self._owns_client = http_client is None
         self.slack_webhook = os.getenv("SLACK_WEBHOOK_URL")
         self.feishu_webhook = os.getenv("FEISHU_WEBHOOK_URL")
         self.enabled = bool(self.slack_webhook or self.feishu_webhook)
         
+        # Pick the delivery channel once; Slack takes precedence over Feishu
+        if self.slack_webhook:
+            self._primary_send = self._send_slack
+        elif self.feishu_webhook:
+            self._primary_send = self._send_feishu
+        else:
+            self._primary_send = None
+        
         if not self.enabled:
             logger.warning("No notification webhooks configured")
     
@@ -34,14 +54,7 @@ class NotificationService:
         if not self.enabled:
             return False
         
-        message = self._format_test_message(test_result)
-        
-        if self.slack_webhook:
-            return await self._send_slack(message)
-        elif self.feishu_webhook:
-            return await self._send_feishu(message)
-        
-        return False
+        return await self._primary_send(self._format_test_message(test_result))
     
     def _format_test_message(self, test_result: Dict) -> str:
         """
@@ -58,20 +71,49 @@ class NotificationService:
         board_id = test_result.get("board_id", "unknown")
         duration = test_result.get("duration", 0)
         
-        emoji = "✅" if status == "passed" else "❌" if status == "failed" else "⏱️"
+        emoji = _EMOJI.get(status, "⏱️")
         
-        message = f"{emoji} Test {status.upper()}\n"
-        message += f"• Test: {test_binary}\n"
-        message += f"• Board: {board_id}\n"
-        message += f"• Duration: {duration:.2f}s\n"
+        parts = [
+            f"{emoji} Test {status.upper()}",
+            f"• Test: {test_binary}",
+            f"• Board: {board_id}",
+            f"• Duration: {duration:.2f}s",
+        ]
         
         if test_result.get("error_message"):
-            message += f"• Error: {test_result['error_message']}\n"
+            parts.append(f"• Error: {test_result['error_message']}")
         
         if test_result.get("output_file"):
-            message += f"• Logs: {test_result['output_file']}\n"
+            parts.append(f"• Logs: {test_result['output_file']}")
+        
+        # Keep the trailing newline of the original line-by-line format
+        parts.append("")
+        return "\n".join(parts)
+    
+    async def _post(self, url: str, payload: Dict) -> httpx.Response:
+        """
+        POST a JSON payload to a webhook.
         
-        return message
+        Args:
+            url: Webhook URL
+            payload: JSON body
+        
+        Returns:
+            httpx.Response: The webhook's response
+        """
+        return await self._get_client().post(url, json=payload, timeout=10.0)
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        """Return the HTTP client, opening the service's own on first use."""
+        if self._http_client is None:
+            self._http_client = httpx.AsyncClient(timeout=10.0)
+        return self._http_client
+    
+    async def close(self) -> None:
+        """Close the HTTP client if the service opened it."""
+        if self._owns_client and self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
     
     async def _send_slack(self, message: str) -> bool:
         """
@@ -84,13 +126,8 @@ class NotificationService:
             bool: True if successful
         """
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    self.slack_webhook,
-                    json={"text": message},
-                    timeout=10.0
-                )
-                return response.status_code == 200
+            response = await self._post(self.slack_webhook, {"text": message})
+            return response.status_code == 200
         except Exception as e:
             logger.error(f"Failed to send Slack notification: {e}")
             return False
@@ -106,16 +143,14 @@ class NotificationService:
             bool: True if successful
         """
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    self.feishu_webhook,
-                    json={
-                        "msg_type": "text",
-                        "content": {"text": message}
-                    },
-                    timeout=10.0
-                )
-                return response.status_code == 200
+            response = await self._post(
+                self.feishu_webhook,
+                {
+                    "msg_type": "text",
+                    "content": {"text": message}
+                }
+            )
+            return response.status_code == 200
         except Exception as e:
             logger.error(f"Failed to send Feishu notification: {e}")
             return False
@@ -1,27 +1,55 @@
 """Constants for soc-validation system."""
 
+from enum import StrEnum
+
+from src.device_manager.manager import LeaseStatus
+
 # Priority levels
 PRIORITY_HIGH = 1
 PRIORITY_NORMAL = 2
 PRIORITY_LOW = 3
 
+
+# Status groups are StrEnums, so members still compare equal to, format as
+# and serialize as their plain string values.
+class TestStatus(StrEnum):
+    """Test execution status."""
+    __test__ = False  # not a pytest test class
+    
+    PENDING = "pending"
+    RUNNING = "running"
+    PASSED = "passed"
+    FAILED = "failed"
+    TIMEOUT = "timeout"
+    CANCELLED = "cancelled"
+
+
+class HealthStatus(StrEnum):
+    """Board health status."""
+    HEALTHY = "healthy"
+    DEGRADED = "degraded"
+    UNHEALTHY = "unhealthy"
+    QUARANTINED = "quarantined"
+
+
 # Test status
-STATUS_PENDING = "pending"
-STATUS_RUNNING = "running"
-STATUS_PASSED = "passed"
-STATUS_FAILED = "failed"
-STATUS_TIMEOUT = "timeout"
-STATUS_CANCELLED = "cancelled"
+STATUS_PENDING = TestStatus.PENDING
+STATUS_RUNNING = TestStatus.RUNNING
+STATUS_PASSED = TestStatus.PASSED
+STATUS_FAILED = TestStatus.FAILED
+STATUS_TIMEOUT = TestStatus.TIMEOUT
+STATUS_CANCELLED = TestStatus.CANCELLED
 
 # Board health status
-HEALTH_HEALTHY = "healthy"
-HEALTH_UNHEALTHY = "unhealthy"
-HEALTH_QUARANTINED = "quarantined"
-
-# Lease status
-LEASE_ACTIVE = "active"
-LEASE_EXPIRED = "expired"
-LEASE_RELEASED = "released"
+HEALTH_HEALTHY = HealthStatus.HEALTHY
+HEALTH_DEGRADED = HealthStatus.DEGRADED
+HEALTH_UNHEALTHY = HealthStatus.UNHEALTHY
+HEALTH_QUARANTINED = HealthStatus.QUARANTINED
+
+# Lease status (LeaseStatus is defined with the device manager)
+LEASE_ACTIVE = LeaseStatus.ACTIVE
+LEASE_EXPIRED = LeaseStatus.EXPIRED
+LEASE_RELEASED = LeaseStatus.RELEASED
 
 # Default timeouts (in seconds)
 DEFAULT_TEST_TIMEOUT = 1800  # 30 minutes
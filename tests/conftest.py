@@ -0,0 +1,86 @@
+"""Shared pytest fixtures."""
+
+import asyncio
+import json
+from datetime import datetime
+
+import pytest
+
+try:
+    import uvloop
+except ImportError:  # uvloop is optional and Unix-only
+    uvloop = None
+
+from src.device_manager import lock_manager as lock_manager_module
+
+
+@pytest.fixture(scope="session")
+def event_loop_policy():
+    """Run async tests on uvloop when it is installed, else on asyncio's default loop."""
+    if uvloop is not None:
+        return uvloop.EventLoopPolicy()
+    return asyncio.DefaultEventLoopPolicy()
+
+
+class VirtualClock:
+    """Monotonic clock that only moves when a test sleeps."""
+    
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture(scope="session")
+def lease_data():
+    """
+    An active lease in the form DeviceManager stores in Redis.
+    
+    Fixed timestamps keep the payload identical across runs. Session-scoped,
+    so treat it as read-only.
+    """
+    return {
+        "lease_id": "lease-123",
+        "board_id": "soc-a-001",
+        "board_ip": "10.1.1.101",
+        "telnet_port": 23,
+        "lock_token": "token-123",
+        "acquired_at": datetime(2024, 1, 1).isoformat(),
+        "expires_at": datetime(2024, 1, 1, 0, 30).isoformat(),
+        "priority": 2,
+        "status": "active"
+    }
+
+
+@pytest.fixture(scope="session")
+def lease_json(lease_data):
+    """lease_data serialized once per session."""
+    return json.dumps(lease_data)
+
+
+def _install_virtual_clock(monkeypatch) -> VirtualClock:
+    """Route asyncio.sleep and the lock manager's deadlines through a VirtualClock."""
+    clock = VirtualClock()
+    real_sleep = asyncio.sleep
+    
+    async def virtual_sleep(delay, result=None):
+        clock.now += delay
+        await real_sleep(0)
+        return result
+    
+    monkeypatch.setattr(asyncio, "sleep", virtual_sleep)
+    monkeypatch.setattr(lock_manager_module, "time_source", clock)
+    return clock
+
+
+@pytest.fixture
+def virtual_clock(monkeypatch):
+    """
+    Run sleep-bound code in virtual time.
+    
+    asyncio.sleep advances the virtual clock and only yields to the event
+    loop, and the lock manager reads its deadlines from the same clock, so
+    tests can assert on retry counts and elapsed virtual seconds.
+    """
+    return _install_virtual_clock(monkeypatch)
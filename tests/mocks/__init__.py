@@ -1,8 +1,10 @@
 """Mock objects for testing."""
 
 from .mock_telnet_server import MockTelnetServer, MockBoardSimulator
+from .mock_redis import InMemoryRedis
 
 __all__ = [
     "MockTelnetServer",
-    "MockBoardSimulator"
+    "MockBoardSimulator",
+    "InMemoryRedis"
 ]
\ No newline at end of file
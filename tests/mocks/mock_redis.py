@@ -0,0 +1,55 @@
+"""In-memory Redis double for testing."""
+
+from fnmatch import fnmatchcase
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class InMemoryRedis:
+    """
+    Dict-backed stand-in for the async Redis client.
+    
+    Implements only the commands DeviceManager issues (get/set/delete/scan),
+    as plain coroutines, so tests assert on stored state instead of
+    AsyncMock call records.
+    """
+    
+    def __init__(self, data: Optional[Dict[str, Any]] = None):
+        """
+        Initialize the double.
+        
+        Args:
+            data: Optional initial key/value contents
+        """
+        self.data: Dict[str, Any] = dict(data or {})
+        self.expirations: Dict[str, int] = {}  # key -> ex seconds from last set
+    
+    async def get(self, key: str) -> Optional[Any]:
+        return self.data.get(key)
+    
+    async def set(self, key: str, value: Any, ex: Optional[int] = None) -> bool:
+        self.data[key] = value
+        if ex is None:
+            self.expirations.pop(key, None)
+        else:
+            self.expirations[key] = ex
+        return True
+    
+    async def delete(self, *keys: str) -> int:
+        deleted = 0
+        for key in keys:
+            if self.data.pop(key, None) is not None:
+                deleted += 1
+            self.expirations.pop(key, None)
+        return deleted
+    
+    async def scan(
+        self,
+        cursor: int = 0,
+        match: Optional[str] = None,
+        count: Optional[int] = None
+    ) -> Tuple[int, List[str]]:
+        """Page through matching keys in sorted order; cursor is an offset."""
+        keys = sorted(k for k in self.data if match is None or fnmatchcase(k, match))
+        end = len(keys) if count is None else cursor + count
+        next_cursor = end if end < len(keys) else 0
+        return next_cursor, keys[cursor:end]
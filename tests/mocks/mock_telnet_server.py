@@ -1,12 +1,49 @@
 """Mock telnet server for testing."""
 
 import asyncio
+import base64
+import functools
 import logging
 import re
-from typing import Dict, List, Optional, Callable
+import socket
+from collections import Counter
+from typing import Dict, List, Optional, Callable, Set, Tuple, Union
 
 logger = logging.getLogger(__name__)
 
+# Stream buffer limit for client connections (large base64 transfer lines)
+READ_LIMIT = 1024 * 1024
+
+# Listener options shared by start() and start_background()
+SERVER_OPTIONS = {
+    "limit": READ_LIMIT,
+    "backlog": 128,
+    "reuse_port": hasattr(socket, "SO_REUSEPORT"),
+}
+
+
+def _encode_response(response: Union[str, bytes, None]) -> bytes:
+    """Encode a command response for the wire; empty responses send nothing."""
+    if not response:
+        return b""
+    if isinstance(response, bytes):
+        return response + b"\n"
+    return (response + "\n").encode()
+
+
+# echo '<payload>' | base64 -d > path (or >> to append), matched on raw bytes
+_BASE64_WRITE = re.compile(rb"^echo\s+'([^']*)'\s*\|\s*base64\s+-d\s*(>>?)\s*(\S+)\s*$")
+
+# Simulated test binary output; %b is the test name
+_TEST_OUTPUT_TEMPLATE = b"""Starting test: %b
+[TEST] Initializing...
+[TEST] Running test cases...
+[TEST] Test 1: PASS
+[TEST] Test 2: PASS
+[TEST] Test 3: PASS
+[TEST] All tests completed successfully
+Test result: PASS"""
+
 
 class MockTelnetServer:
     """
@@ -22,7 +59,7 @@ class MockTelnetServer:
     def __init__(
         self,
         host: str = "127.0.0.1",
-        port: int = 2323,
+        port: int = 0,
         username: str = "admin",
         password: str = "password",
         prompt: str = "mock$ "
@@ -32,7 +69,7 @@ class MockTelnetServer:
         
         Args:
             host: Server host
-            port: Server port
+            port: Server port (0 lets the OS assign a free one)
             username: Expected username
             password: Expected password
             prompt: Shell prompt
@@ -42,11 +79,23 @@ class MockTelnetServer:
         self.username = username
         self.password = password
         self.prompt = prompt
+        self._prompt_bytes = prompt.encode()
+        # Per-connection session, chosen once: servers without a username
+        # skip the login exchange entirely
+        self._serve = self._serve_with_login if username else self._serve_shell
         
         self.server = None
-        self.clients: List[asyncio.StreamWriter] = []
-        self.command_handlers: Dict[str, Callable] = {}
+        self.clients: Set[asyncio.StreamWriter] = set()
+        # pattern -> (compiled pattern, handler, pure), in registration order
+        self.command_handlers: Dict[str, Tuple[re.Pattern, Callable, bool]] = {}
         self.command_responses: Dict[str, str] = {}
+        # command -> wire-ready response bytes (including trailing newline)
+        self._responses_bytes: Dict[str, bytes] = {}
+        # All handler patterns as one alternation; rebuilt lazily on change
+        self._combined: Optional[re.Pattern] = None
+        self._combined_handlers: List[Tuple[re.Pattern, Callable, bool]] = []
+        # Per-instance memo of command -> response/handler resolution
+        self._resolve_command = functools.lru_cache(maxsize=1024)(self._resolve_command_uncached)
         
         # Default command responses
         self._setup_default_responses()
@@ -64,20 +113,45 @@ class MockTelnetServer:
             "df -h": "Filesystem      Size  Used Avail Use% Mounted on\n/dev/root        16G  4.0G   12G  25% /",
             "exit": "",
         }
+        self._responses_bytes = {
+            command: _encode_response(response)
+            for command, response in self.command_responses.items()
+        }
         
         # Setup regex patterns for parameterized commands
-        self.add_regex_handler(r"^echo\s+(.+)$", lambda m: m.group(1))
-        self.add_regex_handler(r"^cat\s+(.+)$", self._handle_cat)
-        self.add_regex_handler(r"^wc\s+-c\s+(.+)$", self._handle_wc)
-        self.add_regex_handler(r"^ls\s+-la\s+(.*)$", self._handle_ls_la)
+        self.add_regex_handler(r"^echo\s+(.+)$", lambda m: m.group(1), pure=True)
+        self.add_regex_handler(r"^cat\s+(.+)$", self._handle_cat, pure=True)
+        self.add_regex_handler(r"^wc\s+-c\s+(.+)$", self._handle_wc, pure=True)
+        self.add_regex_handler(r"^ls\s+-la\s+(.*)$", self._handle_ls_la, pure=True)
     
     def add_command_response(self, command: str, response: str):
         """Add a custom command response."""
         self.command_responses[command] = response
+        self._responses_bytes[command] = _encode_response(response)
+        self._resolve_command.cache_clear()
     
-    def add_regex_handler(self, pattern: str, handler: Callable):
-        """Add a regex-based command handler."""
-        self.command_handlers[pattern] = handler
+    def add_regex_handler(self, pattern: str, handler: Callable, pure: bool = False):
+        """
+        Add a regex-based command handler.
+        
+        Args:
+            pattern: Regex matched against the whole command
+            handler: Callable taking the match and returning the response text
+            pure: True if the response depends only on the command, so it can
+                be cached; stateful handlers are called on every command
+        """
+        self.command_handlers[pattern] = (re.compile(pattern), handler, pure)
+        self._combined = None
+        self._resolve_command.cache_clear()
+    
+    def _build_combined(self) -> re.Pattern:
+        """Compile all handler patterns into a single alternation."""
+        self._combined_handlers = list(self.command_handlers.values())
+        self._combined = re.compile("|".join(
+            f"(?P<h{i}>{compiled.pattern})"
+            for i, (compiled, _, _) in enumerate(self._combined_handlers)
+        ))
+        return self._combined
     
     def _handle_cat(self, match) -> str:
         """Handle cat command."""
@@ -105,13 +179,20 @@ drwxr-xr-x 3 test test 4096 Jan  1 00:00 ..
 -rw-r--r-- 1 test test 1234 Jan  1 00:00 file1.txt
 -rw-r--r-- 1 test test 5678 Jan  1 00:00 file2.txt"""
     
-    async def start(self):
-        """Start the mock server."""
+    async def _listen(self):
+        """Bind the listener and record the port it actually got."""
         self.server = await asyncio.start_server(
             self._handle_client,
             self.host,
-            self.port
+            self.port,
+            **SERVER_OPTIONS
         )
+        # Port 0 lets the OS pick a free port; record the one it bound
+        self.port = self.server.sockets[0].getsockname()[1]
+    
+    async def start(self):
+        """Start the mock server."""
+        await self._listen()
         
         logger.info(f"Mock telnet server started on {self.host}:{self.port}")
         
@@ -120,13 +201,21 @@ drwxr-xr-x 3 test test 4096 Jan  1 00:00 ..
     
     async def start_background(self):
         """Start server in background."""
-        self.server = await asyncio.start_server(
-            self._handle_client,
-            self.host,
-            self.port
-        )
+        await self._listen()
         logger.info(f"Mock telnet server started in background on {self.host}:{self.port}")
     
+    def reset_state(self):
+        """Restore the default command responses so a running server can serve the next test."""
+        self.command_handlers.clear()
+        self._setup_default_responses()
+    
+    async def __aenter__(self) -> "MockTelnetServer":
+        await self.start_background()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.stop()
+    
     async def stop(self):
         """Stop the mock server."""
         if self.server:
@@ -134,88 +223,30 @@ drwxr-xr-x 3 test test 4096 Jan  1 00:00 ..
             await self.server.wait_closed()
             logger.info("Mock telnet server stopped")
         
-        # Close all client connections
-        for client in self.clients:
+        # Close all client connections, then wait for them together
+        clients = list(self.clients)
+        for client in clients:
             client.close()
-            await client.wait_closed()
+        await asyncio.gather(
+            *(client.wait_closed() for client in clients),
+            return_exceptions=True
+        )
         self.clients.clear()
     
     async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
         """Handle client connection."""
         addr = writer.get_extra_info('peername')
+        
+        # Disable Nagle so small prompt/response writes are not held back
+        # waiting on the client's delayed ACK
+        sock = writer.get_extra_info('socket')
+        if sock is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
         logger.info(f"Client connected from {addr}")
-        self.clients.append(writer)
+        self.clients.add(writer)
         
         try:
-            # Handle login if credentials are set
-            if self.username:
-                # Send login prompt
-                writer.write(b"login: ")
-                await writer.drain()
-                
-                # Read username
-                username_data = await reader.readline()
-                username = username_data.decode().strip()
-                
-                if username != self.username:
-                    writer.write(b"Login incorrect\n")
-                    await writer.drain()
-                    return
-                
-                # Send password prompt if password is set
-                if self.password:
-                    writer.write(b"Password: ")
-                    await writer.drain()
-                    
-                    # Read password
-                    password_data = await reader.readline()
-                    password = password_data.decode().strip()
-                    
-                    if password != self.password:
-                        writer.write(b"Login incorrect\n")
-                        await writer.drain()
-                        return
-            
-            # Send initial prompt
-            writer.write(self.prompt.encode())
-            await writer.drain()
-            
-            # Command loop
-            while True:
-                # Read command
-                data = await reader.readline()
-                if not data:
-                    break
-                
-                command = data.decode().strip()
-                logger.debug(f"Received command: {command}")
-                
-                # Handle exit
-                if command == "exit":
-                    break
-                
-                # Echo command (simulate terminal echo)
-                writer.write(data)
-                await writer.drain()
-                
-                # Special handling for blocking_command (for timeout testing)
-                if command == "blocking_command":
-                    # Don't send response or prompt - just hang
-                    await asyncio.sleep(10)
-                    continue
-                
-                # Process command
-                response = self._process_command(command)
-                
-                # Send response
-                if response:
-                    writer.write((response + "\n").encode())
-                    await writer.drain()
-                
-                # Send prompt
-                writer.write(self.prompt.encode())
-                await writer.drain()
-                
+            await self._serve(reader, writer)
         except asyncio.CancelledError:
             pass
         except Exception as e:
@@ -224,11 +255,118 @@ drwxr-xr-x 3 test test 4096 Jan  1 00:00 ..
             # Clean up
             writer.close()
             await writer.wait_closed()
-            if writer in self.clients:
-                self.clients.remove(writer)
+            self.clients.discard(writer)
             logger.info(f"Client disconnected from {addr}")
     
-    def _process_command(self, command: str) -> str:
+    async def _serve_with_login(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Run the login exchange, then the shell session if it succeeds."""
+        if await self._login(reader, writer):
+            await self._serve_shell(reader, writer)
+    
+    async def _login(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> bool:
+        """
+        Prompt for and check credentials.
+        
+        Returns:
+            True if the client logged in, False if it was rejected
+        """
+        # Send login prompt
+        writer.write(b"login: ")
+        await writer.drain()
+        
+        # Read username
+        username_data = await self._read_line(reader)
+        username = username_data.decode().strip()
+        
+        if username != self.username:
+            writer.write(b"Login incorrect\n")
+            await writer.drain()
+            return False
+        
+        # Send password prompt if password is set
+        if self.password:
+            writer.write(b"Password: ")
+            await writer.drain()
+            
+            # Read password
+            password_data = await self._read_line(reader)
+            password = password_data.decode().strip()
+            
+            if password != self.password:
+                writer.write(b"Login incorrect\n")
+                await writer.drain()
+                return False
+        
+        return True
+    
+    async def _serve_shell(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Send the prompt and process commands until exit or EOF."""
+        # Send initial prompt
+        writer.write(self._prompt_bytes)
+        await writer.drain()
+        
+        # Command loop
+        while True:
+            # Read command
+            data = await self._read_line(reader)
+            if not data:
+                break
+            
+            # Raw handlers work on the undecoded line (e.g. base64 uploads)
+            response = self._process_raw(data)
+            if response is not None:
+                writer.write(data + response + self._prompt_bytes)
+                await writer.drain()
+                continue
+            
+            command = data.decode().strip()
+            logger.debug(f"Received command: {command}")
+            
+            # Handle exit
+            if command == "exit":
+                break
+            
+            # Echo command (simulate terminal echo)
+            out = bytearray(data)
+            
+            # Special handling for blocking_command (for timeout testing)
+            if command == "blocking_command":
+                # Don't send response or prompt - just hang
+                writer.write(bytes(out))
+                await writer.drain()
+                await asyncio.sleep(10)
+                continue
+            
+            # Process command
+            response = self._process_command(command)
+            
+            # Send echo, response and prompt in a single write
+            out += response
+            out += self._prompt_bytes
+            writer.write(bytes(out))
+            await writer.drain()
+    
+    @staticmethod
+    async def _read_line(reader: asyncio.StreamReader) -> bytes:
+        """Read one newline-terminated line (or what is left at EOF)."""
+        try:
+            return await reader.readuntil(b"\n")
+        except asyncio.IncompleteReadError as e:
+            return e.partial
+    
+    def _process_raw(self, line: bytes) -> Optional[bytes]:
+        """
+        Handle a command line before it is decoded.
+        
+        Args:
+            line: Raw command line as received, including the newline
+            
+        Returns:
+            Encoded response, or None to fall through to _process_command
+        """
+        return None
+    
+    def _process_command(self, command: str) -> bytes:
         """
         Process command and return response.
         
@@ -236,23 +374,49 @@ drwxr-xr-x 3 test test 4096 Jan  1 00:00 ..
             command: Command to process
             
         Returns:
-            Command response
+            Encoded command response with trailing newline (empty if no output)
+        """
+        resolved = self._resolve_command(command)
+        if isinstance(resolved, bytes):
+            return resolved
+        
+        # Stateful handler: must run on every command
+        compiled, handler = resolved
+        return self._run_handler(handler, compiled.match(command))
+    
+    def _resolve_command_uncached(self, command: str) -> Union[bytes, Tuple[re.Pattern, Callable]]:
+        """
+        Resolve a command to its response, or to the stateful handler for it.
+        
+        The result is memoized per command, so it may only contain responses
+        that are a function of the command text alone.
         """
         # Check exact match first
-        if command in self.command_responses:
-            return self.command_responses[command]
-        
-        # Check regex handlers
-        for pattern, handler in self.command_handlers.items():
-            match = re.match(pattern, command)
-            if match:
-                try:
-                    return handler(match)
-                except Exception as e:
-                    return f"Error: {e}"
+        response = self._responses_bytes.get(command)
+        if response is not None:
+            return response
+        
+        # Check regex handlers: one scan over the combined alternation picks
+        # the first registered pattern that matches
+        combined = self._combined or self._build_combined()
+        hit = combined.match(command)
+        if hit:
+            compiled, handler, pure = self._combined_handlers[int(hit.lastgroup[1:])]
+            if not pure:
+                return compiled, handler
+            # Re-match with the handler's own pattern so group numbers line up
+            return self._run_handler(handler, compiled.match(command))
         
         # Default response for unknown commands
-        return f"{command}: command not found"
+        return _encode_response(f"{command}: command not found")
+    
+    @staticmethod
+    def _run_handler(handler: Callable, match: re.Match) -> bytes:
+        """Call a regex handler and encode its response."""
+        try:
+            return _encode_response(handler(match))
+        except Exception as e:
+            return _encode_response(f"Error: {e}")
 
 
 class MockBoardSimulator(MockTelnetServer):
@@ -269,26 +433,28 @@ class MockBoardSimulator(MockTelnetServer):
         super().__init__(*args, **kwargs)
         
         # Simulated file system
-        self.filesystem: Dict[str, str] = {
-            "/home/test/test.txt": "Test file content",
-            "/home/test/data.bin": "Binary data here",
-            "/tmp/test_output.log": "",
+        self._initial_filesystem: Dict[str, bytes] = {
+            "/home/test/test.txt": b"Test file content",
+            "/home/test/data.bin": b"Binary data here",
+            "/tmp/test_output.log": b"",
         }
+        self.filesystem: Dict[str, bytes] = dict(self._initial_filesystem)
         
-        # Simulated processes
-        self.processes: List[str] = []
+        # Simulated processes: command name -> running instance count
+        self.processes: Counter = Counter()
         
         # Additional handlers
         self._setup_board_handlers()
     
+    def reset_state(self):
+        """Restore the default responses, file system and process table."""
+        super().reset_state()
+        self.filesystem = dict(self._initial_filesystem)
+        self.processes.clear()
+        self._setup_board_handlers()
+    
     def _setup_board_handlers(self):
         """Setup board-specific handlers."""
-        # File operations
-        self.add_regex_handler(
-            r"^echo\s+'(.+)'\s*\|\s*base64\s+-d\s*>\s*(.+)$",
-            self._handle_base64_decode
-        )
-        
         # Process operations
         self.add_regex_handler(r"^ps\s+aux$", self._handle_ps)
         self.add_regex_handler(r"^kill\s+(\d+)$", self._handle_kill)
@@ -297,18 +463,28 @@ class MockBoardSimulator(MockTelnetServer):
         self.add_regex_handler(r"^\.\/(.+)$", self._handle_test_execution)
         self.add_regex_handler(r"^/home/test/(.+)$", self._handle_test_execution)
     
-    def _handle_base64_decode(self, match) -> str:
-        """Handle base64 decode to file."""
-        import base64
-        encoded = match.group(1)
-        filepath = match.group(2)
+    def _process_raw(self, line: bytes) -> Optional[bytes]:
+        """Handle base64 file writes without decoding the payload to str."""
+        match = _BASE64_WRITE.match(line)
+        if match is None:
+            return None
+        return _encode_response(self._handle_base64_decode(match))
+    
+    def _handle_base64_decode(self, match: re.Match) -> str:
+        """Handle base64 decode to file (match groups are bytes)."""
+        encoded, redirect, filepath = match.groups()
+        filepath = filepath.decode()
         
         try:
-            decoded = base64.b64decode(encoded)
-            self.filesystem[filepath] = decoded.decode('utf-8', errors='ignore')
-            return ""
+            data = base64.b64decode(encoded, validate=False)
         except Exception as e:
             return f"base64: invalid input: {e}"
+        
+        if redirect == b">>":
+            self.filesystem[filepath] = self.filesystem.get(filepath, b"") + data
+        else:
+            self.filesystem[filepath] = data
+        return ""
     
     def _handle_ps(self, match) -> str:
         """Handle ps command."""
@@ -316,7 +492,7 @@ class MockBoardSimulator(MockTelnetServer):
         output += "1     root     0:00  /sbin/init\n"
         output += "100   test     0:00  /bin/bash\n"
         
-        for i, proc in enumerate(self.processes, start=1000):
+        for i, proc in enumerate(self.processes.elements(), start=1000):
             output += f"{i}   test     0:00  {proc}\n"
         
         return output
@@ -324,31 +500,28 @@ class MockBoardSimulator(MockTelnetServer):
     def _handle_kill(self, match) -> str:
         """Handle kill command."""
         pid = int(match.group(1))
-        if pid >= 1000 and pid < 1000 + len(self.processes):
-            proc_index = pid - 1000
-            removed = self.processes.pop(proc_index)
+        running = list(self.processes.elements())
+        if pid >= 1000 and pid < 1000 + len(running):
+            removed = running[pid - 1000]
+            self._remove_process(removed)
             return f"Killed process {pid} ({removed})"
         return f"kill: ({pid}) - No such process"
     
-    def _handle_test_execution(self, match) -> str:
+    def _remove_process(self, name: str):
+        """Drop one running instance of a simulated process."""
+        remaining = self.processes[name] - 1
+        if remaining > 0:
+            self.processes[name] = remaining
+        else:
+            self.processes.pop(name, None)
+    
+    def _handle_test_execution(self, match) -> bytes:
         """Simulate test execution."""
         test_name = match.group(1)
         
-        # Add to process list
-        self.processes.append(test_name)
+        # Track the test as running while its output is produced
+        self.processes[test_name] += 1
+        output = _TEST_OUTPUT_TEMPLATE % test_name.encode()
+        self._remove_process(test_name)
         
-        # Simulate test output
-        output = f"""Starting test: {test_name}
-[TEST] Initializing...
-[TEST] Running test cases...
-[TEST] Test 1: PASS
-[TEST] Test 2: PASS
-[TEST] Test 3: PASS
-[TEST] All tests completed successfully
-Test result: PASS"""
-        
-        # Remove from process list
-        if test_name in self.processes:
-            self.processes.remove(test_name)
-        
-        return output
\ No newline at end of file
+        return output
@@ -0,0 +1,95 @@
+"""Fixtures shared by the unit tests."""
+
+import asyncio
+import contextlib
+import socket
+from dataclasses import dataclass
+
+import pytest
+import pytest_asyncio
+from httpx import ASGITransport, AsyncClient
+
+from tests.mocks.mock_telnet_server import MockTelnetServer, MockBoardSimulator
+
+
+@pytest.fixture(scope="session")
+def api():
+    """The API module, imported on first use so collection never builds the FastAPI app."""
+    from src.device_manager import api as api_module
+    return api_module
+
+
+@pytest.fixture(scope="session")
+def asgi_transport(api):
+    """ASGI transport for the app; it keeps no per-request state, so one serves every test."""
+    return ASGITransport(app=api.app)
+
+
+@pytest.fixture
+async def async_client(asgi_transport):
+    """HTTP client that calls the ASGI app directly on the test's event loop."""
+    async with AsyncClient(transport=asgi_transport, base_url="http://test") as client:
+        yield client
+
+
+@dataclass
+class TelnetServers:
+    """The session's mock telnet servers."""
+    auth: MockTelnetServer
+    no_auth: MockTelnetServer
+    board: MockBoardSimulator
+    
+    def all(self):
+        """Every server, in start order."""
+        return (self.auth, self.no_auth, self.board)
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def _telnet_servers():
+    """Start the session's mock telnet servers together, each on an OS-assigned port."""
+    servers = TelnetServers(
+        auth=MockTelnetServer(username="admin", password="password"),
+        no_auth=MockTelnetServer(username=None, password=None),
+        board=MockBoardSimulator(username="test", password="test123")
+    )
+    # The exit stack stops every server that started, even if another failed to
+    async with contextlib.AsyncExitStack() as stack:
+        async with asyncio.TaskGroup() as group:
+            for server in servers.all():
+                group.create_task(stack.enter_async_context(server))
+        yield servers
+
+
+@pytest.fixture
+def mock_server(_telnet_servers):
+    """Session mock telnet server, reset to its default responses."""
+    _telnet_servers.auth.reset_state()
+    return _telnet_servers.auth
+
+
+@pytest.fixture
+def no_auth_server(_telnet_servers):
+    """Session mock telnet server without login, reset to its default responses."""
+    _telnet_servers.no_auth.reset_state()
+    return _telnet_servers.no_auth
+
+
+@pytest.fixture
+def board_simulator(_telnet_servers):
+    """Session board simulator, reset to its initial file system and processes."""
+    _telnet_servers.board.reset_state()
+    return _telnet_servers.board
+
+
+@pytest.fixture(autouse=True)
+def no_network(request, monkeypatch):
+    """Fail any unit test that opens a real connection (e.g. to Redis or a board)."""
+    if request.node.get_closest_marker("allow_network"):
+        return
+    
+    def blocked(*args, **kwargs):
+        raise AssertionError("unit tests must not open network connections")
+    
+    monkeypatch.setattr(socket.socket, "connect", blocked)
+    monkeypatch.setattr(socket.socket, "connect_ex", blocked)
+    monkeypatch.setattr(asyncio, "open_connection", blocked)
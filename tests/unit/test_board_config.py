@@ -1,14 +1,17 @@
 """Unit tests for board configuration management."""
 
+import copy
+import io
+import json
 import pytest
 import yaml
-import tempfile
-from pathlib import Path
 from pydantic import ValidationError
 
 from src.device_manager.config import (
     BoardsConfig,
     load_boards_config,
+    load_boards_configs,
+    list_board_ids,
     save_boards_config,
     get_board_by_id,
     get_board_by_family,
@@ -19,9 +22,9 @@ from src.device_manager.config import (
 from src.device_manager.models import Board
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_boards_data():
-    """Sample boards data for testing."""
+    """Sample boards data for testing (shared; deepcopy before modifying)."""
     return {
         "boards": [
             {
@@ -60,24 +63,37 @@ def sample_boards_data():
     }
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_config(sample_boards_data):
-    """Create a BoardsConfig instance from sample data."""
+    """Create a BoardsConfig instance from sample data (shared, read-only)."""
     boards = [Board(**board) for board in sample_boards_data["boards"]]
     return BoardsConfig(boards=boards)
 
 
 @pytest.fixture
-def temp_config_file(sample_boards_data):
-    """Create a temporary YAML config file."""
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
-        yaml.dump(sample_boards_data, f)
-        temp_path = f.name
-    
-    yield temp_path
-    
-    # Cleanup
-    Path(temp_path).unlink(missing_ok=True)
+def mutable_config(sample_config):
+    """Private deep copy of the sample config for tests that modify it."""
+    return sample_config.model_copy(deep=True)
+
+
+@pytest.fixture(scope="session")
+def sample_yaml(sample_boards_data):
+    """Sample boards data serialized once per session (JSON is valid YAML)."""
+    return json.dumps(sample_boards_data)
+
+
+@pytest.fixture(scope="session")
+def temp_config_file(sample_yaml, tmp_path_factory):
+    """Create a temporary YAML config file (shared, read-only)."""
+    temp_path = tmp_path_factory.mktemp("boards") / "boards.yaml"
+    temp_path.write_text(sample_yaml)
+    return str(temp_path)
+
+
+@pytest.fixture
+def config_stream(sample_yaml):
+    """In-memory YAML config, for loader tests that don't need a real file."""
+    return io.StringIO(sample_yaml)
 
 
 class TestBoardsConfig:
@@ -181,6 +197,58 @@ class TestLoadBoardsConfig:
         assert len(config.boards) == 4
         assert config.boards[0].board_id == "soc-a-001"
     
+    def test_load_from_stream(self, config_stream):
+        """Test loading configuration from an open text stream."""
+        config = load_boards_config(config_stream)
+        assert len(config.boards) == 4
+        assert config.get_families() == {"socA", "socB", "socC"}
+    
+    def test_load_without_validation_skips_incomplete_boards(self):
+        """Test that unvalidated loads still drop boards missing required fields."""
+        data = {
+            "boards": [
+                {"board_id": "soc-001", "soc_family": "socA", "board_ip": "10.1.1.1"},
+                {"board_id": "soc-002", "soc_family": "socA"}  # No board_ip
+            ]
+        }
+        
+        config = load_boards_config(io.StringIO(json.dumps(data)), validate=False)
+        
+        assert [b.board_id for b in config.boards] == ["soc-001"]
+        assert config.boards[0].telnet_port == 23  # Defaults still applied
+    
+    def test_list_board_ids(self, temp_config_file):
+        """Test reading only board IDs without loading the config."""
+        assert list_board_ids(temp_config_file) == ["soc-a-001", "soc-a-002", "soc-b-001", "soc-c-001"]
+        assert list_board_ids(io.StringIO("boards: []")) == []
+    
+    def test_load_uses_cache_until_file_changes(self, sample_boards_data, tmp_path):
+        """Test that unchanged files are served from the cache and edits are picked up."""
+        config_path = tmp_path / "boards.yaml"
+        data = copy.deepcopy(sample_boards_data)
+        with open(config_path, 'w') as f:
+            f.write(json.dumps(data))
+        
+        first = load_boards_config(config_path, validate=False)
+        assert load_boards_config(config_path, validate=False).boards == first.boards
+        
+        data["boards"].pop()
+        with open(config_path, 'w') as f:
+            f.write(json.dumps(data))
+        
+        reloaded = load_boards_config(config_path, validate=False)
+        assert len(reloaded.boards) == 3
+    
+    def test_load_returns_independent_copies(self, temp_config_file):
+        """Test that health changes on one load don't show up in the next."""
+        config = load_boards_config(temp_config_file)
+        assert quarantine_board(config, "soc-a-001", "test")
+        
+        reloaded = load_boards_config(temp_config_file)
+        
+        assert reloaded.boards[0] is not config.boards[0]
+        assert get_board_by_id(reloaded, "soc-a-001").health_status == "healthy"
+    
     def test_load_nonexistent_file(self):
         """Test loading from non-existent file."""
         config = load_boards_config("/nonexistent/path.yaml", validate=False)
@@ -188,27 +256,22 @@ class TestLoadBoardsConfig:
     
     def test_load_empty_file(self):
         """Test loading from empty file."""
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
-            f.write("")
-            temp_path = f.name
-        
-        try:
-            config = load_boards_config(temp_path, validate=False)
-            assert len(config.boards) == 0
-        finally:
-            Path(temp_path).unlink(missing_ok=True)
+        config = load_boards_config(io.StringIO(""), validate=False)
+        assert len(config.boards) == 0
     
     def test_load_invalid_yaml(self):
         """Test loading invalid YAML."""
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
-            f.write("invalid: yaml: content:")
-            temp_path = f.name
+        with pytest.raises(yaml.YAMLError):
+            load_boards_config(io.StringIO("invalid: yaml: content:"))
+    
+    def test_load_invalid_yaml_fails_fast(self):
+        """Test that a syntax error near the top is reported without reading the whole file."""
+        text = "invalid: yaml: content:\n" + "  - board_id: filler\n" * 100_000
+        stream = io.StringIO(text)
         
-        try:
-            with pytest.raises(yaml.YAMLError):
-                load_boards_config(temp_path)
-        finally:
-            Path(temp_path).unlink(missing_ok=True)
+        with pytest.raises(yaml.YAMLError):
+            load_boards_config(stream)
+        assert stream.tell() < len(text)
     
     def test_load_with_validation_errors(self):
         """Test loading with validation errors (duplicate board IDs)."""
@@ -227,15 +290,8 @@ class TestLoadBoardsConfig:
             ]
         }
         
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
-            yaml.dump(data, f)
-            temp_path = f.name
-        
-        try:
-            with pytest.raises(ValueError):
-                load_boards_config(temp_path, validate=True)
-        finally:
-            Path(temp_path).unlink(missing_ok=True)
+        with pytest.raises(ValueError):
+            load_boards_config(io.StringIO(json.dumps(data)), validate=True)
     
     def test_load_with_default_health_status(self):
         """Test that missing health_status gets default value."""
@@ -250,34 +306,60 @@ class TestLoadBoardsConfig:
             ]
         }
         
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
-            yaml.dump(data, f)
-            temp_path = f.name
+        config = load_boards_config(io.StringIO(json.dumps(data)), validate=False)
+        assert config.boards[0].health_status == "healthy"
+
+
+class TestLoadBoardsConfigs:
+    """Test loading and merging several config files."""
+    
+    def test_merge_files(self, sample_boards_data, tmp_path):
+        """Test that boards from all files are merged in path order."""
+        paths = []
+        for idx, board in enumerate(sample_boards_data["boards"]):
+            path = tmp_path / f"rack-{idx}.yaml"
+            path.write_text(json.dumps({"boards": [board]}))
+            paths.append(str(path))
+        
+        config = load_boards_configs(paths, max_workers=2)
         
-        try:
-            config = load_boards_config(temp_path, validate=False)
-            assert config.boards[0].health_status == "healthy"
-        finally:
-            Path(temp_path).unlink(missing_ok=True)
+        assert [b.board_id for b in config.boards] == ["soc-a-001", "soc-a-002", "soc-b-001", "soc-c-001"]
+    
+    def test_duplicate_ids_across_files(self, sample_boards_data, tmp_path):
+        """Test that a board ID repeated in two files fails validation."""
+        board = sample_boards_data["boards"][0]
+        paths = []
+        for rack in ("rack-1", "rack-2"):
+            path = tmp_path / f"{rack}.yaml"
+            path.write_text(json.dumps({"boards": [board]}))
+            paths.append(str(path))
+        
+        with pytest.raises(ValueError, match="Duplicate board IDs"):
+            load_boards_configs(paths, max_workers=2)
+    
+    def test_single_file_copies_cached_boards(self, sample_boards_data, tmp_path):
+        """Test that editing a single-file merge leaves the cached config alone."""
+        path = tmp_path / "rack.yaml"
+        path.write_text(json.dumps(sample_boards_data))
+        
+        config = load_boards_configs([str(path)])
+        config.boards[0].health_status = "quarantined"
+        
+        assert load_boards_config(str(path)).boards[0].health_status == "healthy"
 
 
 class TestSaveBoardsConfig:
     """Test configuration saving."""
     
-    def test_save_config(self, sample_config):
+    def test_save_config(self, sample_config, tmp_path):
         """Test saving configuration to file."""
-        with tempfile.NamedTemporaryFile(suffix='.yaml', delete=False) as f:
-            temp_path = f.name
-        
-        try:
-            save_boards_config(sample_config, temp_path)
-            
-            # Load it back and verify
-            loaded = load_boards_config(temp_path, validate=False)
-            assert len(loaded.boards) == len(sample_config.boards)
-            assert loaded.boards[0].board_id == sample_config.boards[0].board_id
-        finally:
-            Path(temp_path).unlink(missing_ok=True)
+        temp_path = tmp_path / "boards.yaml"
+        save_boards_config(sample_config, temp_path)
+        
+        # Load it back and verify
+        loaded = load_boards_config(temp_path, validate=False)
+        assert len(loaded.boards) == len(sample_config.boards)
+        assert loaded.boards[0].board_id == sample_config.boards[0].board_id
 
 
 class TestUtilityFunctions:
@@ -293,6 +375,17 @@ class TestUtilityFunctions:
         board = get_board_by_id(sample_config, "nonexistent")
         assert board is None
     
+    def test_lookups_follow_boards_list_changes(self, mutable_config):
+        """Test that lookups see boards added after the index was built."""
+        assert get_board_by_id(mutable_config, "soc-d-001") is None
+        
+        mutable_config.boards.append(
+            Board(board_id="soc-d-001", soc_family="socD", board_ip="10.1.4.101")
+        )
+        
+        assert get_board_by_id(mutable_config, "soc-d-001") is not None
+        assert get_board_by_family(mutable_config, "socD").board_id == "soc-d-001"
+    
     def test_get_board_by_family(self, sample_config):
         """Test getting board by family."""
         board = get_board_by_family(sample_config, "socA")
@@ -307,37 +400,43 @@ class TestUtilityFunctions:
         board = get_board_by_family(sample_config, "nonexistent")
         assert board is None
     
-    def test_update_board_health(self, sample_config):
-        """Test updating board health status."""
-        success = update_board_health(sample_config, "soc-a-001", "degraded")
-        assert success is True
+    def test_get_board_by_family_follows_health_updates(self, mutable_config):
+        """Test that the first healthy board in file order is returned after health changes."""
+        update_board_health(mutable_config, "soc-a-001", "degraded")
+        assert get_board_by_family(mutable_config, "socA").board_id == "soc-a-002"
         
-        board = get_board_by_id(sample_config, "soc-a-001")
+        update_board_health(mutable_config, "soc-a-001", "healthy")
+        assert get_board_by_family(mutable_config, "socA").board_id == "soc-a-001"
+        
+        quarantine_board(mutable_config, "soc-a-001")
+        quarantine_board(mutable_config, "soc-a-002")
+        assert get_board_by_family(mutable_config, "socA") is None
+    
+    def test_update_board_health(self, mutable_config):
+        """Test updating board health status."""
+        board = update_board_health(mutable_config, "soc-a-001", "degraded")
+        assert board is get_board_by_id(mutable_config, "soc-a-001")
         assert board.health_status == "degraded"
         
         # Invalid status
-        success = update_board_health(sample_config, "soc-a-001", "invalid")
-        assert success is False
+        assert update_board_health(mutable_config, "soc-a-001", "invalid") is None
+        assert board.health_status == "degraded"
         
         # Nonexistent board
-        success = update_board_health(sample_config, "nonexistent", "healthy")
-        assert success is False
+        assert update_board_health(mutable_config, "nonexistent", "healthy") is None
     
-    def test_quarantine_board(self, sample_config):
+    def test_quarantine_board(self, mutable_config):
         """Test quarantining a board."""
-        board = get_board_by_id(sample_config, "soc-a-001")
+        board = get_board_by_id(mutable_config, "soc-a-001")
         initial_failures = board.failure_count
         
-        success = quarantine_board(sample_config, "soc-a-001", "Test failure")
-        assert success is True
-        
-        board = get_board_by_id(sample_config, "soc-a-001")
+        quarantined = quarantine_board(mutable_config, "soc-a-001", "Test failure")
+        assert quarantined is board
         assert board.health_status == "quarantined"
         assert board.failure_count == initial_failures + 1
         
         # Nonexistent board
-        success = quarantine_board(sample_config, "nonexistent", "Test")
-        assert success is False
+        assert quarantine_board(mutable_config, "nonexistent", "Test") is None
     
     def test_get_available_boards(self, sample_config):
         """Test getting available boards."""
@@ -352,4 +451,71 @@ class TestUtilityFunctions:
         
         # Family with no healthy boards
         available = get_available_boards(sample_config, "socB")
-        assert len(available) == 0  # socB board is degraded
\ No newline at end of file
+        assert len(available) == 0  # socB board is degraded
+
+
+class TestBoardsConfigDirectAssignment:
+    """Test lookups on a config whose boards list is assigned after loading."""
+    
+    def test_get_board_by_family(self):
+        """Test getting board by family."""
+        config = load_boards_config("/nonexistent/path.yaml")
+        config.boards = [
+            Board(
+                board_id='soc-a-001',
+                soc_family='socA',
+                board_ip='10.1.1.101',
+                health_status='healthy'
+            ),
+            Board(
+                board_id='soc-a-002',
+                soc_family='socA',
+                board_ip='10.1.1.102',
+                health_status='unhealthy'
+            ),
+            Board(
+                board_id='soc-b-001',
+                soc_family='socB',
+                board_ip='10.1.2.101',
+                health_status='healthy'
+            )
+        ]
+        
+        # Should get first healthy board from family
+        board = get_board_by_family(config, 'socA')
+        assert board is not None
+        assert board.board_id == 'soc-a-001'
+        
+        # Should get socB board
+        board = get_board_by_family(config, 'socB')
+        assert board is not None
+        assert board.board_id == 'soc-b-001'
+        
+        # Should return None for non-existent family
+        board = get_board_by_family(config, 'socC')
+        assert board is None
+    
+    def test_get_board_by_id(self):
+        """Test getting board by ID."""
+        config = load_boards_config("/nonexistent/path.yaml")
+        config.boards = [
+            Board(
+                board_id='soc-a-001',
+                soc_family='socA',
+                board_ip='10.1.1.101'
+            ),
+            Board(
+                board_id='soc-b-001',
+                soc_family='socB',
+                board_ip='10.1.2.101'
+            )
+        ]
+        
+        # Should find existing board
+        board = get_board_by_id(config, 'soc-a-001')
+        assert board is not None
+        assert board.soc_family == 'socA'
+        
+        # Should return None for non-existent ID
+        board = get_board_by_id(config, 'soc-c-001')
+        assert board is None
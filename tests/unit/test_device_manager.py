@@ -1,21 +1,37 @@
 """Unit tests for device manager core functionality."""
 
+import asyncio
 import pytest
 import uuid
 from datetime import datetime, timedelta
 from unittest.mock import AsyncMock, MagicMock, patch
 import json
 
+from src.device_manager import manager as manager_module
 from src.device_manager.manager import (
     DeviceManager,
     LeaseStatus,
-    AllocationStrategy
+    AllocationStrategy,
+    LEASE_SCAN_COUNT
 )
 from src.device_manager.models import Board, Lease, LeaseRequest
-from src.device_manager.config import BoardsConfig
+from src.device_manager.config import BoardsConfig, get_board_by_id
+from src.device_manager.lock_manager import DistributedLockManager
+from src.device_manager.redis_client import RedisClient
+from tests.mocks.mock_redis import InMemoryRedis
 
 
-@pytest.fixture
+# One xdist worker builds the session-scoped boards for the whole module
+pytestmark = pytest.mark.xdist_group(name="device_manager")
+
+# DeviceManager only reads lease requests, so each one is validated once here
+SOCA_REQUEST = LeaseRequest(board_family="socA", timeout=1800, priority=2)
+SOCA_HIGH_PRIORITY_REQUEST = LeaseRequest(board_family="socA", timeout=1800, priority=1)
+SOCB_REQUEST = LeaseRequest(board_family="socB", timeout=1800, priority=2)
+SOCC_REQUEST = LeaseRequest(board_family="socC", timeout=1800, priority=2)  # Non-existent family
+
+
+@pytest.fixture(scope="session")
 def sample_boards():
     """Create sample boards for testing."""
     return [
@@ -54,33 +70,67 @@ def sample_boards():
     ]
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def board_config(sample_boards):
     """Create board configuration."""
     return BoardsConfig(boards=sample_boards)
 
 
+# Wall clock seen by DeviceManager in these tests; matches lease_data's acquired_at
+FROZEN_NOW = datetime(2024, 1, 1)
+
+
+class _FrozenDatetime(datetime):
+    """datetime whose now() always returns FROZEN_NOW."""
+    
+    @classmethod
+    def now(cls, tz=None):
+        return FROZEN_NOW
+
+
+@pytest.fixture(autouse=True)
+def frozen_time(monkeypatch):
+    """Pin the manager's clock so lease timestamps and TTLs are deterministic."""
+    monkeypatch.setattr(manager_module, "datetime", _FrozenDatetime)
+    return FROZEN_NOW
+
+
+@pytest.fixture(autouse=True)
+def _restore_boards(sample_boards, board_config):
+    """Reset the runtime board fields tests mutate on the shared boards."""
+    snapshot = [(b.failure_count, b.health_status, b.last_used) for b in sample_boards]
+    yield
+    for board, (failure_count, health_status, last_used) in zip(sample_boards, snapshot, strict=True):
+        board.failure_count = failure_count
+        board.health_status = health_status
+        board.last_used = last_used
+    # Health changes re-rank the index's families; rebuild it from file order
+    board_config.reindex()
+
+
 @pytest.fixture
 def mock_lock_manager():
     """Create mock lock manager."""
-    mock = AsyncMock()
-    mock.acquire_lock = AsyncMock()
-    mock.release_lock = AsyncMock()
-    mock.extend_lock = AsyncMock()
-    mock.get_lock_info = AsyncMock()
-    return mock
+    # spec limits the mock to the real API; async methods come back as AsyncMocks
+    return AsyncMock(spec=DistributedLockManager)
 
 
 @pytest.fixture
 def mock_redis_client():
     """Create mock Redis client."""
-    mock = AsyncMock()
-    mock.get_client = AsyncMock()
-    return mock
+    return AsyncMock(spec=RedisClient)
+
+
+@pytest.fixture
+def redis_double(mock_redis_client, lease_data, lease_json):
+    """In-memory Redis behind mock_redis_client, seeded with lease_data."""
+    redis = InMemoryRedis({f"lease:{lease_data['lease_id']}": lease_json})
+    mock_redis_client.get_client.return_value = redis
+    return redis
 
 
 @pytest.fixture
-async def device_manager(board_config, mock_lock_manager, mock_redis_client):
+def device_manager(board_config, mock_lock_manager, mock_redis_client):
     """Create device manager instance."""
     return DeviceManager(
         config=board_config,
@@ -129,26 +179,14 @@ class TestDeviceManagerInit:
 class TestBoardAcquisition:
     """Test board acquisition functionality."""
     
-    @pytest.mark.asyncio
-    async def test_acquire_board_success(self, device_manager, mock_lock_manager, mock_redis_client):
+    async def test_acquire_board_success(self, device_manager, mock_lock_manager, redis_double):
         """Test successful board acquisition."""
         # Setup mocks
         lock_token = "token-123"
         mock_lock_manager.acquire_lock.return_value = lock_token
         
-        redis_mock = AsyncMock()
-        redis_mock.set = AsyncMock()
-        mock_redis_client.get_client.return_value = redis_mock
-        
-        # Create request
-        request = LeaseRequest(
-            board_family="socA",
-            timeout=1800,
-            priority=2
-        )
-        
         # Acquire board
-        lease = await device_manager.acquire_board(request)
+        lease = await device_manager.acquire_board(SOCA_REQUEST)
         
         # Verify
         assert lease is not None
@@ -157,126 +195,81 @@ class TestBoardAcquisition:
         assert lease.lock_token == lock_token
         assert lease.priority == 2
         
-        # Check lock was acquired
-        mock_lock_manager.acquire_lock.assert_called_once()
-        
-        # Check lease was stored in Redis
-        redis_mock.set.assert_called_once()
+        # Check the lock was acquired once and the lease stored in Redis
+        lease_key = f"lease:{lease.lease_id}"
+        assert mock_lock_manager.acquire_lock.call_count == 1
+        assert json.loads(redis_double.data[lease_key])["board_id"] == lease.board_id
+        assert lease.acquired_at == FROZEN_NOW
+        assert redis_double.expirations[lease_key] == SOCA_REQUEST.timeout
     
-    @pytest.mark.asyncio
     async def test_acquire_board_no_available(self, device_manager):
         """Test acquisition when no boards available."""
-        request = LeaseRequest(
-            board_family="socC",  # Non-existent family
-            timeout=1800,
-            priority=2
-        )
-        
-        lease = await device_manager.acquire_board(request)
+        lease = await device_manager.acquire_board(SOCC_REQUEST)
         assert lease is None
     
-    @pytest.mark.asyncio
-    async def test_acquire_board_all_locked(self, device_manager, mock_lock_manager):
+    @pytest.mark.parametrize("max_retries", [1, 2, 3, 5])
+    async def test_acquire_board_all_locked(
+        self, board_config, mock_lock_manager, mock_redis_client, monkeypatch, max_retries
+    ):
         """Test acquisition when all boards are locked."""
+        # Record the backoff delays instead of sleeping through them
+        sleep = AsyncMock()
+        monkeypatch.setattr(asyncio, "sleep", sleep)
+        
         # Mock all lock attempts to fail
         mock_lock_manager.acquire_lock.return_value = None
         
-        request = LeaseRequest(
-            board_family="socA",
-            timeout=1800,
-            priority=1
+        dm = DeviceManager(
+            config=board_config,
+            lock_manager=mock_lock_manager,
+            redis_client=mock_redis_client,
+            max_retries=max_retries
         )
-        
-        lease = await device_manager.acquire_board(request)
+        lease = await dm.acquire_board(SOCA_HIGH_PRIORITY_REQUEST)
         assert lease is None
         
-        # Should have tried multiple times due to retries
-        assert mock_lock_manager.acquire_lock.call_count >= 2
+        # Each attempt tries both healthy socA boards once
+        assert mock_lock_manager.acquire_lock.call_count == 2 * max_retries
+        
+        # Backoff grows by 0.5s between attempts, with no sleep after the last
+        delays = [call.args[0] for call in sleep.await_args_list]
+        assert delays == [0.5 * attempt for attempt in range(1, max_retries)]
     
-    @pytest.mark.asyncio
-    async def test_acquire_board_skip_unhealthy(self, device_manager, mock_lock_manager, mock_redis_client):
+    async def test_acquire_board_skip_unhealthy(self, device_manager, mock_lock_manager, redis_double):
         """Test that unhealthy boards are skipped."""
         # Setup successful lock for healthy board
         mock_lock_manager.acquire_lock.return_value = "token-123"
         
-        redis_mock = AsyncMock()
-        redis_mock.set = AsyncMock()
-        mock_redis_client.get_client.return_value = redis_mock
-        
-        request = LeaseRequest(
-            board_family="socB",
-            timeout=1800,
-            priority=2
-        )
-        
-        lease = await device_manager.acquire_board(request)
+        lease = await device_manager.acquire_board(SOCB_REQUEST)
         
         # Should get the healthy board, not the quarantined one
         assert lease is not None
         assert lease.board_id == "soc-b-001"
         assert lease.board_ip == "10.1.2.101"
     
-    @pytest.mark.asyncio
-    async def test_acquire_board_with_strategy(self, device_manager, mock_lock_manager, mock_redis_client):
+    @pytest.mark.parametrize("strategy", [
+        AllocationStrategy.FIRST_AVAILABLE,
+        AllocationStrategy.LEAST_USED,
+        AllocationStrategy.RANDOM
+    ])
+    async def test_acquire_board_with_strategy(self, device_manager, mock_lock_manager, redis_double, strategy):
         """Test different allocation strategies."""
         mock_lock_manager.acquire_lock.return_value = "token-123"
         
-        redis_mock = AsyncMock()
-        redis_mock.set = AsyncMock()
-        mock_redis_client.get_client.return_value = redis_mock
-        
-        request = LeaseRequest(board_family="socA")
-        
-        # Test FIRST_AVAILABLE strategy (default)
-        lease = await device_manager.acquire_board(
-            request,
-            strategy=AllocationStrategy.FIRST_AVAILABLE
-        )
-        assert lease is not None
-        
-        # Test LEAST_USED strategy
-        lease = await device_manager.acquire_board(
-            request,
-            strategy=AllocationStrategy.LEAST_USED
-        )
-        assert lease is not None
-        
-        # Test RANDOM strategy
-        lease = await device_manager.acquire_board(
-            request,
-            strategy=AllocationStrategy.RANDOM
-        )
+        lease = await device_manager.acquire_board(SOCA_REQUEST, strategy=strategy)
         assert lease is not None
+        assert lease.board_id in ["soc-a-001", "soc-a-002"]
 
 
 class TestBoardRelease:
     """Test board release functionality."""
     
-    @pytest.mark.asyncio
-    async def test_release_board_success(self, device_manager, mock_lock_manager, mock_redis_client):
+    async def test_release_board_success(self, device_manager, mock_lock_manager, redis_double):
         """Test successful board release."""
         lease_id = "lease-123"
         board_id = "soc-a-001"
         lock_token = "token-123"
         
-        # Mock Redis to return lease data
-        lease_data = {
-            "lease_id": lease_id,
-            "board_id": board_id,
-            "board_ip": "10.1.1.101",
-            "telnet_port": 23,
-            "lock_token": lock_token,
-            "acquired_at": datetime.now().isoformat(),
-            "expires_at": (datetime.now() + timedelta(minutes=30)).isoformat(),
-            "priority": 2,
-            "status": "active"
-        }
-        
-        redis_mock = AsyncMock()
-        redis_mock.get.return_value = json.dumps(lease_data)
-        redis_mock.delete = AsyncMock()
-        mock_redis_client.get_client.return_value = redis_mock
-        
         # Mock successful lock release
         mock_lock_manager.release_lock.return_value = True
         
@@ -285,114 +278,53 @@ class TestBoardRelease:
         
         assert result is True
         mock_lock_manager.release_lock.assert_called_once_with(board_id, lock_token)
-        redis_mock.delete.assert_called_once()
+        assert f"lease:{lease_id}" not in redis_double.data
     
-    @pytest.mark.asyncio
-    async def test_release_board_not_found(self, device_manager, mock_redis_client):
+    async def test_release_board_not_found(self, device_manager, redis_double):
         """Test releasing non-existent lease."""
-        redis_mock = AsyncMock()
-        redis_mock.get.return_value = None
-        mock_redis_client.get_client.return_value = redis_mock
-        
         result = await device_manager.release_board("non-existent-lease")
         assert result is False
     
-    @pytest.mark.asyncio
-    async def test_release_board_lock_failure(self, device_manager, mock_lock_manager, mock_redis_client):
+    async def test_release_board_lock_failure(self, device_manager, mock_lock_manager, redis_double):
         """Test release when lock release fails."""
         lease_id = "lease-123"
         
-        lease_data = {
-            "lease_id": lease_id,
-            "board_id": "soc-a-001",
-            "board_ip": "10.1.1.101",
-            "telnet_port": 23,
-            "lock_token": "token-123",
-            "acquired_at": datetime.now().isoformat(),
-            "expires_at": (datetime.now() + timedelta(minutes=30)).isoformat(),
-            "priority": 2,
-            "status": "active"
-        }
-        
-        redis_mock = AsyncMock()
-        redis_mock.get.return_value = json.dumps(lease_data)
-        redis_mock.delete = AsyncMock()
-        mock_redis_client.get_client.return_value = redis_mock
-        
         # Mock lock release failure
         mock_lock_manager.release_lock.return_value = False
         
         # Should still clean up lease
         result = await device_manager.release_board(lease_id)
         assert result is True
-        redis_mock.delete.assert_called_once()
+        assert f"lease:{lease_id}" not in redis_double.data
 
 
 class TestLeaseExtension:
     """Test lease extension functionality."""
     
-    @pytest.mark.asyncio
-    async def test_extend_lease_success(self, device_manager, mock_lock_manager, mock_redis_client):
+    async def test_extend_lease_success(self, device_manager, mock_lock_manager, redis_double):
         """Test successful lease extension."""
         lease_id = "lease-123"
-        additional_time = 1800
-        
-        lease_data = {
-            "lease_id": lease_id,
-            "board_id": "soc-a-001",
-            "board_ip": "10.1.1.101",
-            "telnet_port": 23,
-            "lock_token": "token-123",
-            "acquired_at": datetime.now().isoformat(),
-            "expires_at": (datetime.now() + timedelta(minutes=30)).isoformat(),
-            "priority": 2,
-            "status": "active"
-        }
-        
-        redis_mock = AsyncMock()
-        redis_mock.get.return_value = json.dumps(lease_data)
-        redis_mock.set = AsyncMock()
-        mock_redis_client.get_client.return_value = redis_mock
+        additional_time = 3600
         
         mock_lock_manager.extend_lock.return_value = True
         
         result = await device_manager.extend_lease(lease_id, additional_time)
         
         assert result is True
-        mock_lock_manager.extend_lock.assert_called_once()
-        redis_mock.set.assert_called_once()
+        assert mock_lock_manager.extend_lock.call_count == 1
+        stored = json.loads(redis_double.data[f"lease:{lease_id}"])
+        assert stored["expires_at"] == (FROZEN_NOW + timedelta(seconds=additional_time)).isoformat()
+        assert redis_double.expirations[f"lease:{lease_id}"] == additional_time
     
-    @pytest.mark.asyncio
-    async def test_extend_lease_not_found(self, device_manager, mock_redis_client):
+    async def test_extend_lease_not_found(self, device_manager, redis_double):
         """Test extending non-existent lease."""
-        redis_mock = AsyncMock()
-        redis_mock.get.return_value = None
-        mock_redis_client.get_client.return_value = redis_mock
-        
         result = await device_manager.extend_lease("non-existent")
         assert result is False
     
-    @pytest.mark.asyncio
-    async def test_extend_lease_lock_failure(self, device_manager, mock_lock_manager, mock_redis_client):
+    async def test_extend_lease_lock_failure(self, device_manager, mock_lock_manager, redis_double):
         """Test extension when lock extend fails."""
         lease_id = "lease-123"
         
-        lease_data = {
-            "lease_id": lease_id,
-            "board_id": "soc-a-001",
-            "board_ip": "10.1.1.101",
-            "telnet_port": 23,
-            "lock_token": "token-123",
-            "acquired_at": datetime.now().isoformat(),
-            "expires_at": (datetime.now() + timedelta(minutes=30)).isoformat(),
-            "priority": 2,
-            "status": "active"
-        }
-        
-        redis_mock = AsyncMock()
-        redis_mock.get.return_value = json.dumps(lease_data)
-        mock_redis_client.get_client.return_value = redis_mock
-        
         mock_lock_manager.extend_lock.return_value = False
         
         result = await device_manager.extend_lease(lease_id)
@@ -402,7 +334,6 @@ class TestLeaseExtension:
 class TestBoardStatus:
     """Test board status functionality."""
     
-    @pytest.mark.asyncio
     async def test_get_board_status_unlocked(self, device_manager, mock_lock_manager):
         """Test getting status of unlocked board."""
         board_id = "soc-a-001"
@@ -417,8 +348,7 @@ class TestBoardStatus:
         assert status["is_locked"] is False
         assert status["lease_id"] is None
     
-    @pytest.mark.asyncio
-    async def test_get_board_status_locked(self, device_manager, mock_lock_manager, mock_redis_client):
+    async def test_get_board_status_locked(self, device_manager, mock_lock_manager, redis_double):
         """Test getting status of locked board."""
         board_id = "soc-a-001"
         lease_id = "lease-123"
@@ -428,31 +358,12 @@ class TestBoardStatus:
             "token": "token-123"
         }
         
-        # Mock finding lease
-        lease_data = {
-            "lease_id": lease_id,
-            "board_id": board_id,
-            "board_ip": "10.1.1.101",
-            "telnet_port": 23,
-            "lock_token": "token-123",
-            "acquired_at": datetime.now().isoformat(),
-            "expires_at": (datetime.now() + timedelta(minutes=30)).isoformat(),
-            "priority": 2,
-            "status": "active"
-        }
-        
-        redis_mock = AsyncMock()
-        redis_mock.scan = AsyncMock(return_value=(0, [f"lease:{lease_id}"]))
-        redis_mock.get.return_value = json.dumps(lease_data)
-        mock_redis_client.get_client.return_value = redis_mock
-        
         status = await device_manager.get_board_status(board_id)
         
         assert status["is_locked"] is True
         assert status["lease_id"] == lease_id
         assert status["expires_at"] is not None
     
-    @pytest.mark.asyncio
     async def test_get_board_status_not_found(self, device_manager):
         """Test getting status of non-existent board."""
         status = await device_manager.get_board_status("non-existent")
@@ -462,13 +373,12 @@ class TestBoardStatus:
 class TestFailureReporting:
     """Test failure reporting functionality."""
     
-    @pytest.mark.asyncio
     async def test_report_failure_increment(self, device_manager):
         """Test failure count increment."""
         board_id = "soc-a-001"
         
         # Get initial failure count
-        board = next(b for b in device_manager.config.boards if b.board_id == board_id)
+        board = get_board_by_id(device_manager.config, board_id)
         initial_count = board.failure_count
         
         # Report failure (not enough to quarantine)
@@ -477,13 +387,12 @@ class TestFailureReporting:
         assert not quarantined
         assert board.failure_count == initial_count + 1
     
-    @pytest.mark.asyncio
     async def test_report_failure_quarantine(self, device_manager):
         """Test automatic quarantine after threshold."""
         board_id = "soc-a-001"
         
         # Get board and set failure count near threshold
-        board = next(b for b in device_manager.config.boards if b.board_id == board_id)
+        board = get_board_by_id(device_manager.config, board_id)
         board.failure_count = device_manager.quarantine_threshold - 1
         
         # Report failure should trigger quarantine
@@ -496,12 +405,11 @@ class TestFailureReporting:
         assert quarantined
         assert board.health_status == "quarantined"
     
-    @pytest.mark.asyncio
     async def test_report_failure_no_quarantine(self, device_manager):
         """Test failure reporting without quarantine."""
         board_id = "soc-a-001"
         
-        board = next(b for b in device_manager.config.boards if b.board_id == board_id)
+        board = get_board_by_id(device_manager.config, board_id)
         board.failure_count = device_manager.quarantine_threshold - 1
         
         # Report failure with quarantine disabled
@@ -515,7 +423,6 @@ class TestFailureReporting:
         assert board.health_status == "healthy"
         assert board.failure_count == device_manager.quarantine_threshold
     
-    @pytest.mark.asyncio
     async def test_report_failure_invalid_board(self, device_manager):
         """Test reporting failure for non-existent board."""
         result = await device_manager.report_failure("non-existent", "Test")
@@ -525,15 +432,14 @@ class TestFailureReporting:
 class TestQueueStatus:
     """Test queue status functionality."""
     
-    @pytest.mark.asyncio
     async def test_get_queue_status(self, device_manager, mock_redis_client):
         """Test getting queue status."""
         # Mock active lease count
         redis_mock = AsyncMock()
-        redis_mock.scan = AsyncMock(side_effect=[
+        redis_mock.scan.side_effect = [
             (100, ["lease:1", "lease:2"]),
             (0, ["lease:3"])
-        ])
+        ]
         mock_redis_client.get_client.return_value = redis_mock
         
         status = await device_manager.get_queue_status()
@@ -545,15 +451,23 @@ class TestQueueStatus:
         assert "families" in status
         assert status["quarantine_threshold"] == 3
     
-    @pytest.mark.asyncio
-    async def test_get_queue_status_no_leases(self, device_manager, mock_redis_client):
-        """Test queue status with no active leases."""
+    async def test_get_queue_status_single_scan(self, device_manager, mock_redis_client):
+        """Test that a fleet's leases are counted in one SCAN round trip."""
         redis_mock = AsyncMock()
-        redis_mock.scan = AsyncMock(return_value=(0, []))
+        redis_mock.scan.return_value = (0, ["lease:1", "lease:2", "lease:3"])
         mock_redis_client.get_client.return_value = redis_mock
         
         status = await device_manager.get_queue_status()
         
+        assert status["active_leases"] == 3
+        redis_mock.scan.assert_awaited_once_with(cursor=0, match="lease:*", count=LEASE_SCAN_COUNT)
+    
+    async def test_get_queue_status_no_leases(self, device_manager, mock_redis_client):
+        """Test queue status with no active leases."""
+        mock_redis_client.get_client.return_value = InMemoryRedis()
+        
+        status = await device_manager.get_queue_status()
+        
         assert status["active_leases"] == 0
         assert status["available_boards"] == 3
 
@@ -561,39 +475,17 @@ class TestQueueStatus:
 class TestLeaseInfo:
     """Test lease information retrieval."""
     
-    @pytest.mark.asyncio
-    async def test_get_lease_info_exists(self, device_manager, mock_redis_client):
+    async def test_get_lease_info_exists(self, device_manager, redis_double):
         """Test getting existing lease info."""
         lease_id = "lease-123"
         
-        lease_data = {
-            "lease_id": lease_id,
-            "board_id": "soc-a-001",
-            "board_ip": "10.1.1.101",
-            "telnet_port": 23,
-            "lock_token": "token-123",
-            "acquired_at": datetime.now().isoformat(),
-            "expires_at": (datetime.now() + timedelta(minutes=30)).isoformat(),
-            "priority": 2,
-            "status": "active"
-        }
-        
-        redis_mock = AsyncMock()
-        redis_mock.get.return_value = json.dumps(lease_data)
-        mock_redis_client.get_client.return_value = redis_mock
-        
         lease = await device_manager.get_lease_info(lease_id)
         
         assert lease is not None
         assert lease.lease_id == lease_id
         assert lease.board_id == "soc-a-001"
     
-    @pytest.mark.asyncio
-    async def test_get_lease_info_not_found(self, device_manager, mock_redis_client):
+    async def test_get_lease_info_not_found(self, device_manager, redis_double):
         """Test getting non-existent lease info."""
-        redis_mock = AsyncMock()
-        redis_mock.get.return_value = None
-        mock_redis_client.get_client.return_value = redis_mock
-        
         lease = await device_manager.get_lease_info("non-existent")
         assert lease is None
\ No newline at end of file
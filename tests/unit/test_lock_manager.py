@@ -1,27 +1,36 @@
 """Unit tests for the distributed lock manager."""
 
 import asyncio
+import re
 import pytest
+from itertools import chain, repeat
 from unittest.mock import AsyncMock, MagicMock, patch
 import uuid
 from datetime import datetime, timedelta
 
 from src.device_manager.lock_manager import DistributedLockManager, MultiResourceLockManager
 
+# One event loop (uvloop when installed, see conftest) serves every test in the module
+pytestmark = pytest.mark.asyncio(loop_scope="session")
+
+# Owner-checked scripts: a GET of the lock key followed by the guarded command
+_RELEASE_LUA_RE = re.compile(r"redis\.call\(['\"]get['\"].*redis\.call\(['\"]del['\"]", re.S)
+_EXTEND_LUA_RE = re.compile(r"redis\.call\(['\"]get['\"].*redis\.call\(['\"]expire['\"]", re.S)
+
 
 @pytest.fixture
 def mock_redis():
-    """Create a mock Redis client."""
-    mock = AsyncMock()
-    mock.set = AsyncMock()
-    mock.get = AsyncMock()
-    mock.delete = AsyncMock()
-    mock.exists = AsyncMock()
-    mock.eval = AsyncMock()
-    mock.ttl = AsyncMock()
-    mock.expire = AsyncMock()
-    mock.scan = AsyncMock()
-    return mock
+    """Mock Redis client, built per test so assigned attributes (pipeline, register_script) don't leak."""
+    return AsyncMock()
+
+
+@pytest.fixture
+def mock_pipeline(mock_redis):
+    """Attach a mock pipeline to the mock Redis client."""
+    pipe = MagicMock()
+    pipe.execute = AsyncMock()
+    mock_redis.pipeline = MagicMock(return_value=pipe)
+    return pipe
 
 
 @pytest.fixture
@@ -49,7 +58,6 @@ def multi_lock_manager(mock_redis):
 class TestDistributedLockManager:
     """Test cases for DistributedLockManager."""
 
-    @pytest.mark.asyncio
     async def test_acquire_lock_success(self, lock_manager, mock_redis):
         """Test successful lock acquisition."""
         mock_redis.set.return_value = True
@@ -64,7 +72,6 @@ class TestDistributedLockManager:
         assert args[1]["nx"] is True
         assert args[1]["ex"] == 60
 
-    @pytest.mark.asyncio
     async def test_acquire_lock_already_locked(self, lock_manager, mock_redis):
         """Test acquiring lock when resource is already locked."""
         mock_redis.set.return_value = False
@@ -74,32 +81,69 @@ class TestDistributedLockManager:
         assert token is None
         mock_redis.set.assert_called_once()
 
-    @pytest.mark.asyncio
-    async def test_acquire_lock_with_blocking(self, lock_manager, mock_redis):
+    async def test_acquire_lock_with_blocking(self, lock_manager, mock_redis, virtual_clock):
         """Test acquiring lock with blocking enabled."""
-        # First attempt fails, second succeeds
-        mock_redis.set.side_effect = [False, False, True]
+        # First two attempts fail, every later one succeeds
+        mock_redis.set.side_effect = chain([False, False], repeat(True))
         
         token = await lock_manager.acquire_lock("board-001", blocking=True)
         
         assert token is not None
-        assert mock_redis.set.call_count >= 2
+        assert mock_redis.set.call_count == 3
+        # Two retry_interval waits before the successful attempt
+        assert virtual_clock.now == pytest.approx(0.2)
 
-    @pytest.mark.asyncio
-    async def test_acquire_lock_blocking_timeout(self, lock_manager, mock_redis):
+    async def test_acquire_lock_blocking_timeout(self, lock_manager, mock_redis, virtual_clock):
         """Test blocking acquisition timing out."""
         mock_redis.set.return_value = False
         lock_manager.blocking_timeout = 0.3  # Short timeout for test
         
-        start_time = asyncio.get_event_loop().time()
         token = await lock_manager.acquire_lock("board-001", blocking=True)
-        elapsed = asyncio.get_event_loop().time() - start_time
         
         assert token is None
-        assert elapsed >= 0.3
-        assert elapsed < 0.5  # Should not take too long
+        # Initial attempt plus one retry per 0.1s interval until the deadline
+        assert mock_redis.set.call_count == 4
+        assert virtual_clock.now == pytest.approx(0.3)
+
+    async def test_acquire_lock_many(self, lock_manager, mock_pipeline):
+        """Test acquiring several locks through one pipeline."""
+        pipe = mock_pipeline
+        pipe.execute.return_value = [True, False, True]
+        
+        locks = await lock_manager.acquire_lock_many(["board-001", "board-002", "board-003"], timeout=60)
+        
+        assert set(locks) == {"board-001", "board-003"}
+        assert pipe.set.call_count == 3
+        pipe.execute.assert_awaited_once()
+        args = pipe.set.call_args_list[1]
+        assert args[0][0] == "lock:board:board-002"
+        assert args[1]["nx"] is True
+        assert args[1]["ex"] == 60
+
+    async def test_acquire_lock_batch_all_or_nothing(self, lock_manager, mock_redis, mock_pipeline):
+        """Test that a partial batch acquisition hands back the locks it got."""
+        mock_redis.register_script = MagicMock(return_value=AsyncMock())
+        mock_pipeline.execute.side_effect = [[True, False, True], [1, 1]]
+        
+        locks = await lock_manager.acquire_lock_batch(["board-001", "board-002", "board-003"])
+        
+        assert locks is None
+        assert mock_pipeline.execute.await_count == 2  # One acquire, one release round trip
+        release_script = mock_redis.register_script.return_value
+        released = [call.kwargs["keys"][0] for call in release_script.await_args_list]
+        assert released == ["lock:board:board-001", "lock:board:board-003"]
+        assert lock_manager._local_locks == {}
+
+    async def test_release_lock_batch(self, lock_manager, mock_redis, mock_pipeline):
+        """Test releasing several locks through one pipeline."""
+        mock_redis.register_script = MagicMock(return_value=AsyncMock())
+        mock_pipeline.execute.return_value = [1, 0]
+        
+        results = await lock_manager.release_lock_batch({"board-001": "token-001", "board-002": "token-002"})
+        
+        assert results == {"board-001": True, "board-002": False}
+        mock_pipeline.execute.assert_awaited_once()
 
-    @pytest.mark.asyncio
     async def test_release_lock_success(self, lock_manager, mock_redis):
         """Test successful lock release."""
         mock_redis.eval.return_value = 1
@@ -110,10 +154,8 @@ class TestDistributedLockManager:
         mock_redis.eval.assert_called_once()
         args = mock_redis.eval.call_args
         # Check that Lua script is used for atomic release
-        assert "get" in args[0][0]
-        assert "del" in args[0][0]
+        assert _RELEASE_LUA_RE.search(args[0][0])
 
-    @pytest.mark.asyncio
     async def test_release_lock_not_owner(self, lock_manager, mock_redis):
         """Test releasing lock when not the owner."""
         mock_redis.eval.return_value = 0
@@ -122,7 +164,6 @@ class TestDistributedLockManager:
         
         assert result is False
 
-    @pytest.mark.asyncio
     async def test_extend_lock_success(self, lock_manager, mock_redis):
         """Test successful lock extension."""
         mock_redis.eval.return_value = 1
@@ -131,8 +172,8 @@ class TestDistributedLockManager:
         
         assert result is True
         mock_redis.eval.assert_called_once()
+        assert _EXTEND_LUA_RE.search(mock_redis.eval.call_args[0][0])
 
-    @pytest.mark.asyncio
     async def test_extend_lock_not_owner(self, lock_manager, mock_redis):
         """Test extending lock when not the owner."""
         mock_redis.eval.return_value = 0
@@ -141,7 +182,6 @@ class TestDistributedLockManager:
         
         assert result is False
 
-    @pytest.mark.asyncio
     async def test_is_locked(self, lock_manager, mock_redis):
         """Test checking if resource is locked."""
         mock_redis.exists.return_value = 1
@@ -151,7 +191,6 @@ class TestDistributedLockManager:
         assert result is True
         mock_redis.exists.assert_called_once_with("lock:board:board-001")
 
-    @pytest.mark.asyncio
     async def test_is_not_locked(self, lock_manager, mock_redis):
         """Test checking if resource is not locked."""
         mock_redis.exists.return_value = 0
@@ -160,31 +199,30 @@ class TestDistributedLockManager:
         
         assert result is False
 
-    @pytest.mark.asyncio
-    async def test_get_lock_info_exists(self, lock_manager, mock_redis):
+    async def test_get_lock_info_exists(self, lock_manager, mock_pipeline):
         """Test getting lock information when lock exists."""
-        mock_redis.get.return_value = b"test-token"
-        mock_redis.ttl.return_value = 120
+        mock_pipeline.execute.return_value = [b"test-token", 120]
         lock_manager._local_locks["board-001"] = "test-token"
         
         info = await lock_manager.get_lock_info("board-001")
         
+        mock_pipeline.get.assert_called_once_with("lock:board:board-001")
+        mock_pipeline.ttl.assert_called_once_with("lock:board:board-001")
+        mock_pipeline.execute.assert_awaited_once()
         assert info is not None
         assert info["resource_id"] == "board-001"
         assert info["token"] == "test-token"
         assert info["ttl"] == 120
         assert info["is_owner"] is True
 
-    @pytest.mark.asyncio
-    async def test_get_lock_info_not_exists(self, lock_manager, mock_redis):
+    async def test_get_lock_info_not_exists(self, lock_manager, mock_pipeline):
         """Test getting lock information when lock doesn't exist."""
-        mock_redis.get.return_value = None
+        mock_pipeline.execute.return_value = [None, -2]
         
         info = await lock_manager.get_lock_info("board-001")
         
         assert info is None
 
-    @pytest.mark.asyncio
     async def test_lock_context_manager_success(self, lock_manager, mock_redis):
         """Test using lock as context manager successfully."""
         mock_redis.set.return_value = True
@@ -198,7 +236,6 @@ class TestDistributedLockManager:
         # Lock should be released after context
         mock_redis.eval.assert_called_once()
 
-    @pytest.mark.asyncio
     async def test_lock_context_manager_failure(self, lock_manager, mock_redis):
         """Test context manager when lock acquisition fails."""
         mock_redis.set.return_value = False
@@ -210,19 +247,22 @@ class TestDistributedLockManager:
         # Release should not be called if lock was not acquired
         mock_redis.eval.assert_not_called()
 
-    @pytest.mark.asyncio
-    async def test_clear_expired_locks(self, lock_manager, mock_redis):
-        """Test clearing expired locks."""
-        mock_redis.scan.return_value = (0, [b"lock:board:test1", b"lock:board:test2"])
-        mock_redis.ttl.side_effect = [-1, 30]  # First has no TTL, second is fine
+    @pytest.mark.parametrize("n,expired", [(2, 1), (100, 50), (1000, 500)])
+    async def test_clear_expired_locks(self, lock_manager, mock_redis, n, expired):
+        """Test clearing expired locks checks each key exactly once."""
+        keys = [f"lock:board:b{i}".encode() for i in range(n)]
+        mock_redis.scan.return_value = (0, keys)
+        # The first `expired` keys have no TTL, the rest are fine
+        mock_redis.ttl.side_effect = [-1] * expired + [30] * (n - expired)
         mock_redis.expire.return_value = True
         
         cleared = await lock_manager.clear_expired_locks()
         
-        assert cleared == 1
-        mock_redis.expire.assert_called_once()
+        assert cleared == expired
+        assert mock_redis.ttl.call_count == n
+        assert mock_redis.expire.call_count == expired
+        assert [c.args[0] for c in mock_redis.expire.call_args_list] == keys[:expired]
 
-    @pytest.mark.asyncio
     async def test_force_unlock(self, lock_manager, mock_redis):
         """Test force unlocking a resource."""
         mock_redis.delete.return_value = 1
@@ -236,38 +276,47 @@ class TestDistributedLockManager:
 class TestMultiResourceLockManager:
     """Test cases for MultiResourceLockManager."""
 
-    @pytest.mark.asyncio
-    async def test_acquire_multiple_locks_success(self, multi_lock_manager, mock_redis):
-        """Test acquiring multiple locks successfully."""
-        mock_redis.set.return_value = True
+    async def test_acquire_multiple_locks_success(self, multi_lock_manager, mock_redis, mock_pipeline):
+        """Test acquiring multiple locks in one pipelined round trip."""
+        mock_pipeline.set.return_value = mock_pipeline
+        mock_pipeline.execute.return_value = [True, True, True]
         
         locks = await multi_lock_manager.acquire_multiple_locks(
             ["board-001", "board-002", "board-003"]
         )
         
         assert locks is not None
-        assert len(locks) == 3
-        assert "board-001" in locks
-        assert "board-002" in locks
-        assert "board-003" in locks
-        assert mock_redis.set.call_count == 3
+        assert set(locks) == {"board-001", "board-002", "board-003"}
+        assert mock_pipeline.set.call_count == 3
+        assert mock_pipeline.execute.call_count == 1
+        mock_redis.set.assert_not_called()
 
-    @pytest.mark.asyncio
-    async def test_acquire_multiple_locks_partial_failure(self, multi_lock_manager, mock_redis):
+    async def test_acquire_multiple_locks_partial_failure(self, multi_lock_manager, mock_redis, mock_pipeline):
         """Test acquiring multiple locks with partial failure."""
-        # First two succeed, third fails
-        mock_redis.set.side_effect = [True, True, False]
-        mock_redis.eval.return_value = 1
+        mock_redis.register_script = MagicMock(return_value=AsyncMock())
+        # First two succeed, third fails; the release round trip frees both
+        mock_pipeline.execute.side_effect = [[True, True, False], [1, 1]]
         
         locks = await multi_lock_manager.acquire_multiple_locks(
-            ["board-001", "board-002", "board-003"]
+            ["board-001", "board-002", "board-003"], blocking=False
         )
         
         assert locks is None
         # The successfully acquired locks should be released
-        assert mock_redis.eval.call_count == 2  # Two releases
+        assert mock_redis.register_script.return_value.await_count == 2
+        assert multi_lock_manager._local_locks == {}
+
+    async def test_acquire_multiple_locks_blocking(self, multi_lock_manager, mock_redis, mock_pipeline, virtual_clock):
+        """Test that a blocked batch is retried whole after retry_interval."""
+        mock_redis.register_script = MagicMock(return_value=AsyncMock())
+        mock_pipeline.execute.side_effect = [[True, False], [1], [True, True]]
+        
+        locks = await multi_lock_manager.acquire_multiple_locks(["board-001", "board-002"])
+        
+        assert set(locks) == {"board-001", "board-002"}
+        assert mock_pipeline.execute.await_count == 3  # Acquire, release, acquire
+        assert virtual_clock.now == pytest.approx(0.1)
 
-    @pytest.mark.asyncio
     async def test_release_multiple_locks(self, multi_lock_manager, mock_redis):
         """Test releasing multiple locks."""
         mock_redis.eval.side_effect = [1, 1, 0]  # Two succeed, one fails
@@ -286,32 +335,21 @@ class TestMultiResourceLockManager:
         assert mock_redis.eval.call_count == 3
 
 
-@pytest.mark.asyncio
 async def test_concurrent_lock_acquisition():
     """Test that locks properly handle concurrent acquisition attempts."""
     mock_redis = AsyncMock()
-    acquired_count = 0
-    
-    async def try_acquire(manager, resource_id):
-        nonlocal acquired_count
-        # Only first attempt should succeed
-        if acquired_count == 0:
-            mock_redis.set.return_value = True
-            acquired_count += 1
-        else:
-            mock_redis.set.return_value = False
-        
-        token = await manager.acquire_lock(resource_id, blocking=False)
-        return token is not None
+    # Redis resolves SET NX races: exactly one caller, whichever runs first, wins
+    mock_redis.set.side_effect = [True, False, False]
     
     manager = DistributedLockManager(mock_redis)
     
     # Try to acquire same lock concurrently
-    results = await asyncio.gather(
-        try_acquire(manager, "board-001"),
-        try_acquire(manager, "board-001"),
-        try_acquire(manager, "board-001"),
+    tokens = await asyncio.gather(
+        manager.acquire_lock("board-001", blocking=False),
+        manager.acquire_lock("board-001", blocking=False),
+        manager.acquire_lock("board-001", blocking=False),
     )
     
     # Only one should succeed
-    assert sum(results) == 1
\ No newline at end of file
+    assert sum(token is not None for token in tokens) == 1
+    assert mock_redis.set.call_count == 3
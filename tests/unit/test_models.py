@@ -5,6 +5,10 @@ from datetime import datetime, timedelta
 from src.device_manager.models import Board, LeaseRequest, Lease, TestSubmission, TestResult
 
 
+# Fixed timestamp for model construction; the tests don't depend on wall time
+NOW = datetime(2024, 1, 1, 12, 0, 0)
+
+
 class TestBoardModel:
     """Test Board model."""
     
@@ -73,18 +77,9 @@ class TestLeaseRequest:
 class TestLease:
     """Test Lease model."""
     
-    def test_lease_creation(self):
+    def test_lease_creation(self, lease_data):
         """Test creating a Lease instance."""
-        now = datetime.now()
-        expires = now + timedelta(minutes=30)
-        
-        lease = Lease(
-            lease_id="lease-123",
-            board_id="soc-a-001",
-            acquired_at=now,
-            expires_at=expires,
-            status="active"
-        )
+        lease = Lease(**lease_data)
         
         assert lease.lease_id == "lease-123"
         assert lease.board_id == "soc-a-001"
@@ -132,16 +127,13 @@ class TestTestResult:
     
     def test_test_result_creation(self):
         """Test creating a TestResult instance."""
-        started = datetime.now()
-        completed = started + timedelta(minutes=5)
-        
         result = TestResult(
             result_id="result-123",
             flow_run_id="flow-456",
             board_id="soc-a-001",
             test_binary="/path/to/test",
-            started_at=started,
-            completed_at=completed,
+            started_at=NOW,
+            completed_at=NOW + timedelta(minutes=5),
             status="passed",
             output_file="/data/artifacts/result-123/output.log"
         )
@@ -157,7 +149,7 @@ class TestTestResult:
             flow_run_id="flow-999",
             board_id="soc-b-001",
             test_binary="/path/to/test",
-            started_at=datetime.now(),
+            started_at=NOW,
             status="failed",
             error_message="Test assertion failed"
         )
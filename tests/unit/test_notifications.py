@@ -2,32 +2,62 @@
 
 import pytest
 import os
-from unittest.mock import patch, AsyncMock
+import json
+import httpx
+from unittest.mock import patch
 from src.notifications.notifier import NotificationService
 
+SLACK_ENV = {'SLACK_WEBHOOK_URL': 'https://hooks.slack.com/test'}
+FEISHU_ENV = {'FEISHU_WEBHOOK_URL': 'https://open.feishu.cn/test'}
+
+
+# The service reads the environment only in __init__, so each configuration
+# is built once per module and the environment restored straight away
+@pytest.fixture(scope="module")
+def disabled_service():
+    """NotificationService with no webhooks configured."""
+    with patch.dict(os.environ, {}, clear=True):
+        return NotificationService()
+
+
+@pytest.fixture(scope="module")
+def slack_service():
+    """NotificationService with only a Slack webhook configured."""
+    with patch.dict(os.environ, SLACK_ENV, clear=True):
+        return NotificationService()
+
+
+def make_service(client, env=SLACK_ENV):
+    """Service configured from env that posts through the test's HTTP client."""
+    with patch.dict(os.environ, env, clear=True):
+        return NotificationService(http_client=client)
+
+
+def recording_handler(requests, status_code=200):
+    """MockTransport handler that records each request and answers with status_code."""
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(status_code)
+    return handler
+
 
 class TestNotificationService:
     """Test NotificationService."""
     
-    def test_initialization_no_webhooks(self):
+    def test_initialization_no_webhooks(self, disabled_service):
         """Test initialization without webhooks."""
-        with patch.dict(os.environ, {}, clear=True):
-            service = NotificationService()
-            assert not service.enabled
-            assert service.slack_webhook is None
-            assert service.feishu_webhook is None
+        assert not disabled_service.enabled
+        assert disabled_service.slack_webhook is None
+        assert disabled_service.feishu_webhook is None
     
-    def test_initialization_with_slack(self):
+    def test_initialization_with_slack(self, slack_service):
         """Test initialization with Slack webhook."""
-        with patch.dict(os.environ, {'SLACK_WEBHOOK_URL': 'https://hooks.slack.com/test'}):
-            service = NotificationService()
-            assert service.enabled
-            assert service.slack_webhook == 'https://hooks.slack.com/test'
-            assert service.feishu_webhook is None
+        assert slack_service.enabled
+        assert slack_service.slack_webhook == 'https://hooks.slack.com/test'
+        assert slack_service.feishu_webhook is None
     
-    def test_format_test_message_passed(self):
+    def test_format_test_message_passed(self, disabled_service):
         """Test formatting passed test message."""
-        service = NotificationService()
         test_result = {
             'status': 'passed',
             'test_binary': '/path/to/test',
@@ -36,16 +66,15 @@ class TestNotificationService:
             'output_file': '/data/artifacts/test-123/output.log'
         }
         
-        message = service._format_test_message(test_result)
+        message = disabled_service._format_test_message(test_result)
         assert '✅' in message
         assert 'PASSED' in message
         assert '/path/to/test' in message
         assert 'soc-a-001' in message
         assert '123.45s' in message
     
-    def test_format_test_message_failed(self):
+    def test_format_test_message_failed(self, disabled_service):
         """Test formatting failed test message."""
-        service = NotificationService()
         test_result = {
             'status': 'failed',
             'test_binary': '/path/to/test',
@@ -54,63 +83,190 @@ class TestNotificationService:
             'error_message': 'Assertion failed at line 42'
         }
         
-        message = service._format_test_message(test_result)
+        message = disabled_service._format_test_message(test_result)
         assert '❌' in message
         assert 'FAILED' in message
         assert 'Assertion failed at line 42' in message
     
     @pytest.mark.asyncio
-    async def test_send_test_completed_disabled(self):
+    async def test_send_test_completed_disabled(self, disabled_service):
         """Test send_test_completed when notifications are disabled."""
-        with patch.dict(os.environ, {}, clear=True):
-            service = NotificationService()
-            result = await service.send_test_completed({'status': 'passed'})
-            assert result is False
+        result = await disabled_service.send_test_completed({'status': 'passed'})
+        assert result is False
+    
+    @pytest.mark.asyncio
+    async def test_send_test_completed_feishu_only(self):
+        """Test send_test_completed falls back to Feishu when Slack is not configured."""
+        requests = []
+        handler = recording_handler(requests)
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            service = make_service(client, env=FEISHU_ENV)
+            result = await service.send_test_completed({'status': 'passed', 'duration': 1.0})
+        
+        assert result is True
+        assert str(requests[0].url) == 'https://open.feishu.cn/test'
+        payload = json.loads(requests[0].content)
+        assert payload['msg_type'] == 'text'
+        assert 'PASSED' in payload['content']['text']
     
     @pytest.mark.asyncio
     async def test_send_slack_success(self):
         """Test successful Slack notification."""
-        with patch.dict(os.environ, {'SLACK_WEBHOOK_URL': 'https://hooks.slack.com/test'}):
-            service = NotificationService()
-            
-            with patch('httpx.AsyncClient') as mock_client:
-                mock_response = AsyncMock()
-                mock_response.status_code = 200
-                mock_client.return_value.__aenter__.return_value.post = AsyncMock(return_value=mock_response)
-                
-                result = await service._send_slack("Test message")
-                assert result is True
+        requests = []
+        handler = recording_handler(requests)
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            service = make_service(client)
+            result = await service._send_slack("Test message")
+        
+        assert result is True
+        assert str(requests[0].url) == 'https://hooks.slack.com/test'
+        assert json.loads(requests[0].content) == {"text": "Test message"}
     
     @pytest.mark.asyncio
     async def test_send_slack_failure(self):
         """Test failed Slack notification."""
-        with patch.dict(os.environ, {'SLACK_WEBHOOK_URL': 'https://hooks.slack.com/test'}):
+        def handler(request):
+            raise httpx.ConnectError("Network error", request=request)
+        
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            service = make_service(client)
+            result = await service._send_slack("Test message")
+        
+        assert result is False
+    
+    @pytest.mark.asyncio
+    async def test_owned_client_reused_until_close(self):
+        """Test the service keeps one HTTP client of its own and closes it."""
+        with patch.dict(os.environ, SLACK_ENV, clear=True):
             service = NotificationService()
-            
-            with patch('httpx.AsyncClient') as mock_client:
-                mock_client.return_value.__aenter__.return_value.post = AsyncMock(side_effect=Exception("Network error"))
-                
-                result = await service._send_slack("Test message")
-                assert result is False
+        
+        client = service._get_client()
+        assert service._get_client() is client
+        
+        await service.close()
+        assert client.is_closed
+    
+    @pytest.mark.asyncio
+    async def test_close_leaves_injected_client_open(self):
+        """Test close() does not close a caller-owned client."""
+        def handler(request):
+            return httpx.Response(200)
+        
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            service = make_service(client)
+            await service.close()
+            assert not client.is_closed
     
     @pytest.mark.asyncio
     async def test_send_queue_alert(self):
         """Test queue alert notification."""
-        with patch.dict(os.environ, {'SLACK_WEBHOOK_URL': 'https://hooks.slack.com/test'}):
-            service = NotificationService()
+        requests = []
+        handler = recording_handler(requests)
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            service = make_service(client)
             
             # Should not send if wait time < 30 minutes
             result = await service.send_queue_alert(10, 25.0)
             assert result is False
+            assert requests == []
             
             # Should send if wait time >= 30 minutes
-            with patch.object(service, '_send_slack', return_value=True) as mock_send:
-                result = await service.send_queue_alert(20, 35.0)
-                assert result is True
-                mock_send.assert_called_once()
-                
-                # Check message content
-                call_args = mock_send.call_args[0][0]
-                assert '⚠️ Queue Alert' in call_args
-                assert '20 tests' in call_args
-                assert '35.0 minutes' in call_args
\ No newline at end of file
+            result = await service.send_queue_alert(20, 35.0)
+            assert result is True
+        
+        assert len(requests) == 1
+        
+        # Check message content
+        message = json.loads(requests[0].content)['text']
+        assert '⚠️ Queue Alert' in message
+        assert '20 tests' in message
+        assert '35.0 minutes' in message
+
+@pytest.fixture(scope="module")
+def notifications_api():
+    """The notification API module, imported on first use so collection never builds the app."""
+    from src.notifications import api as api_module
+    return api_module
+
+
+@pytest.fixture
+async def slack_client(notifications_api):
+    """HTTP client for the notification app that records the ASGI messages it sends."""
+    sent = []
+    
+    async def recording_app(scope, receive, send):
+        async def record(message):
+            sent.append(message["type"])
+            await send(message)
+        await notifications_api.app(scope, receive, record)
+    
+    transport = httpx.ASGITransport(app=recording_app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        client.sent = sent
+        yield client
+
+
+class TestSlackWebhook:
+    """Test the Slack webhook endpoint."""
+    
+    @pytest.mark.asyncio
+    async def test_run_test_triggers_after_response(self, notifications_api, slack_client, monkeypatch):
+        """Test /run-test replies first, then triggers the deployment with (text, user)."""
+        calls = []
+        
+        def trigger(text, user):
+            # Runs in the webhook thread pool; snapshot what was sent so far
+            calls.append((text, user, list(slack_client.sent)))
+        
+        monkeypatch.setattr(notifications_api, "trigger_prefect_deployment", trigger)
+        
+        response = await slack_client.post("/webhooks/slack", json={
+            "command": "/run-test",
+            "text": "boot_test socA",
+            "user_name": "alice"
+        })
+        
+        assert response.status_code == 200
+        assert response.json() == {
+            "response_type": "in_channel",
+            "text": "Test requested by @alice for: boot_test socA"
+        }
+        text, user, sent_before_trigger = calls[0]
+        assert (text, user) == ("boot_test socA", "alice")
+        assert "http.response.body" in sent_before_trigger
+        assert len(calls) == 1
+    
+    @pytest.mark.asyncio
+    async def test_known_command_dispatches_to_handler(self, notifications_api, slack_client, monkeypatch):
+        """Test a registered slash command's handler gets (text, user) and builds the reply."""
+        calls = []
+        
+        def handler(text, user, background_tasks):
+            calls.append((text, user))
+            return {"response_type": "in_channel", "text": "handled"}
+        
+        monkeypatch.setitem(notifications_api._SLACK_COMMANDS, "/status", handler)
+        
+        response = await slack_client.post("/webhooks/slack", json={
+            "command": "/status",
+            "text": "socA",
+            "user_name": "alice"
+        })
+        
+        assert response.json() == {"response_type": "in_channel", "text": "handled"}
+        assert calls == [("socA", "alice")]
+    
+    @pytest.mark.asyncio
+    async def test_unknown_command(self, slack_client):
+        """Test an unregistered slash command gets an ephemeral error reply."""
+        response = await slack_client.post("/webhooks/slack", json={
+            "command": "/deploy",
+            "text": "prod",
+            "user_name": "alice"
+        })
+        
+        assert response.status_code == 200
+        assert response.json() == {
+            "response_type": "ephemeral",
+            "text": "Unknown command: /deploy"
+        }
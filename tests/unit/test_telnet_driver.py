@@ -1,14 +1,24 @@
 """Unit and integration tests for telnet driver."""
 
 import asyncio
+import dataclasses
 import pytest
+import pytest_asyncio
 import tempfile
 import os
-import random
+import re
+import socket
 from unittest.mock import AsyncMock, MagicMock, patch
 
-# Set default timeout for async tests
-pytestmark = pytest.mark.asyncio(timeout=10)
+# Set default timeout for tests; they reach the shared mock servers
+# (see conftest) over loopback TCP. The async test classes are marked to
+# run on the session loop those servers live on.
+pytestmark = [
+    pytest.mark.timeout(10),
+    pytest.mark.allow_network,
+    # One xdist worker starts the session-scoped servers for the whole module
+    pytest.mark.xdist_group(name="telnet_server")
+]
 
 from src.device_manager.drivers.telnet_driver import (
     TelnetDriver,
@@ -17,7 +27,13 @@ from src.device_manager.drivers.telnet_driver import (
     TelnetTimeoutError,
     ConnectionState
 )
-from tests.mocks.mock_telnet_server import MockTelnetServer, MockBoardSimulator
+
+
+def unused_port() -> int:
+    """Return a loopback port nothing is listening on, unique across xdist workers."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
 
 
 @pytest.fixture
@@ -25,7 +41,7 @@ def telnet_config():
     """Create test telnet configuration."""
     return TelnetConfig(
         host="127.0.0.1",
-        port=random.randint(60001, 65000),  # Random port to avoid conflicts
+        port=unused_port(),
         username="admin",
         password="password",
         timeout=5,
@@ -40,46 +56,67 @@ def telnet_driver(telnet_config):
     return TelnetDriver(telnet_config)
 
 
-@pytest.fixture
-async def mock_server():
-    """Create and start mock telnet server."""
-    # Use random port to avoid conflicts
-    port = random.randint(10000, 20000)
-    server = MockTelnetServer(
+async def _open_driver(server, username, password):
+    """Connect a driver to a running mock server."""
+    driver = TelnetDriver(TelnetConfig(
         host="127.0.0.1",
-        port=port,
-        username="admin",
-        password="password"
-    )
-    
-    # Start server in background
-    await server.start_background()
-    
-    yield server
-    
-    # Cleanup
-    await server.stop()
+        port=server.port,
+        username=username,
+        password=password
+    ))
+    await driver.connect()
+    return driver
+
+
+@pytest_asyncio.fixture(scope="class", loop_scope="session")
+async def _class_driver(_telnet_servers):
+    """One logged-in connection to the mock server for a whole test class."""
+    driver = await _open_driver(_telnet_servers.auth, "admin", "password")
+    yield driver
+    await driver.disconnect()
+
+
+@pytest_asyncio.fixture(scope="class", loop_scope="session")
+async def _class_board_driver(_telnet_servers):
+    """One logged-in connection to the board simulator for a whole test class."""
+    driver = await _open_driver(_telnet_servers.board, "test", "test123")
+    yield driver
+    await driver.disconnect()
+
+
+# Read-only board commands -> substrings their output must contain
+SYSTEM_INFO = {
+    "uname -a": ["Linux", "mock-board"],
+    "cat /proc/cpuinfo": ["processor", "Mock CPU"],
+    "free -m": ["Mem:", "2048"],
+    "df -h": ["Filesystem", "/dev/root"],
+}
+# One alternation per command finds all of its expected substrings in one scan
+_SYSTEM_INFO_RE = {
+    command: re.compile("|".join(map(re.escape, tokens)))
+    for command, tokens in SYSTEM_INFO.items()
+}
+
+
+@pytest_asyncio.fixture(scope="class", loop_scope="session")
+async def system_info_outputs(_class_board_driver):
+    """Run every SYSTEM_INFO command once per class; command -> output."""
+    outputs = await _class_board_driver.execute_commands(list(SYSTEM_INFO))
+    return dict(zip(SYSTEM_INFO, outputs, strict=True))
 
 
 @pytest.fixture
-async def board_simulator():
-    """Create and start board simulator."""
-    # Use random port to avoid conflicts
-    port = random.randint(20001, 30000)
-    simulator = MockBoardSimulator(
-        host="127.0.0.1",
-        port=port,
-        username="test",
-        password="test123"
-    )
-    
-    # Start server in background
-    await simulator.start_background()
-    
-    yield simulator
-    
-    # Cleanup
-    await simulator.stop()
+def connected_driver(_class_driver, mock_server):
+    """The class's connection, with its command history cleared for this test."""
+    _class_driver.clear_history()
+    return _class_driver
+
+
+@pytest.fixture
+def board_driver(_class_board_driver, board_simulator):
+    """The class's board simulator connection, with its command history cleared."""
+    _class_board_driver.clear_history()
+    return _class_board_driver
 
 
 class TestTelnetConfig:
@@ -114,6 +151,13 @@ class TestTelnetConfig:
         assert config.password == "secret"
         assert config.timeout == 60
         assert config.shell_prompt == "# "
+    
+    def test_config_is_frozen(self):
+        """Test configuration cannot be changed once built."""
+        config = TelnetConfig(host="10.0.0.1")
+        
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            config.port = 2323
 
 
 class TestTelnetDriverInit:
@@ -131,10 +175,10 @@ class TestTelnetDriverInit:
         assert len(driver._command_history) == 0
 
 
+@pytest.mark.asyncio(loop_scope="session")
 class TestTelnetConnection:
     """Test telnet connection functionality."""
     
-    @pytest.mark.asyncio
     async def test_connect_success(self, mock_server):
         """Test successful connection."""
         config = TelnetConfig(
@@ -154,41 +198,26 @@ class TestTelnetConnection:
         
         await driver.disconnect()
     
-    @pytest.mark.asyncio
-    async def test_connect_no_auth(self):
+    async def test_connect_no_auth(self, no_auth_server):
         """Test connection without authentication."""
-        # Create mock server without auth with random port
-        port = random.randint(30001, 40000)
-        server = MockTelnetServer(
-            host="127.0.0.1",
-            port=port,
-            username=None,
-            password=None
-        )
-        await server.start_background()
-        
         config = TelnetConfig(
             host="127.0.0.1",
-            port=port,
+            port=no_auth_server.port,
             timeout=5
         )
         driver = TelnetDriver(config)
         
-        try:
-            await driver.connect()
-            
-            assert driver.state == ConnectionState.CONNECTED
-            
-            await driver.disconnect()
-        finally:
-            await server.stop()
+        await driver.connect()
+        
+        assert driver.state == ConnectionState.CONNECTED
+        
+        await driver.disconnect()
     
-    @pytest.mark.asyncio
     async def test_connect_failure(self):
         """Test connection failure."""
         config = TelnetConfig(
             host="127.0.0.1",
-            port=9999,  # Non-existent port
+            port=unused_port(),  # Nothing listening
             connect_timeout=1,
             retry_count=2
         )
@@ -200,7 +229,6 @@ class TestTelnetConnection:
         assert "Failed to connect" in str(exc_info.value)
         assert driver.state == ConnectionState.ERROR
     
-    @pytest.mark.asyncio
     async def test_connect_already_connected(self, mock_server):
         """Test connecting when already connected."""
         config = TelnetConfig(
@@ -223,7 +251,6 @@ class TestTelnetConnection:
         
         await driver.disconnect()
     
-    @pytest.mark.asyncio
     async def test_disconnect(self, mock_server):
         """Test disconnection."""
         config = TelnetConfig(
@@ -242,34 +269,21 @@ class TestTelnetConnection:
         assert driver.writer is None
 
 
+@pytest.mark.asyncio(loop_scope="session")
 class TestCommandExecution:
     """Test command execution functionality."""
     
-    @pytest.mark.asyncio
-    async def test_execute_command_simple(self, mock_server):
+    async def test_execute_command_simple(self, connected_driver):
         """Test simple command execution."""
-        config = TelnetConfig(
-            host="127.0.0.1",
-            port=mock_server.port,
-            username="admin",
-            password="password"
-        )
-        driver = TelnetDriver(config)
-        
-        await driver.connect()
-        
         # Execute command
-        output = await driver.execute_command("echo alive")
+        output = await connected_driver.execute_command("echo alive")
         assert "alive" in output
         
         # Check command history
-        history = driver.get_command_history()
+        history = connected_driver.get_command_history()
         assert len(history) == 1
         assert history[0][0] == "echo alive"
-        
-        await driver.disconnect()
     
-    @pytest.mark.asyncio
     async def test_execute_command_not_connected(self, telnet_driver):
         """Test command execution when not connected."""
         with pytest.raises(TelnetConnectionError) as exc_info:
@@ -277,7 +291,6 @@ class TestCommandExecution:
         
         assert "Not connected" in str(exc_info.value)
     
-    @pytest.mark.asyncio
     async def test_execute_command_timeout(self, mock_server):
         """Test command timeout."""
         # The mock server doesn't actually sleep, so we test with a command 
@@ -301,34 +314,21 @@ class TestCommandExecution:
         
         await driver.disconnect()
     
-    @pytest.mark.asyncio
-    async def test_execute_commands_batch(self, mock_server):
+    async def test_execute_commands_batch(self, connected_driver):
         """Test batch command execution."""
-        config = TelnetConfig(
-            host="127.0.0.1",
-            port=mock_server.port,
-            username="admin",
-            password="password"
-        )
-        driver = TelnetDriver(config)
-        
-        await driver.connect()
-        
         commands = ["echo test1", "echo test2", "whoami"]
-        outputs = await driver.execute_commands(commands)
+        outputs = await connected_driver.execute_commands(commands)
         
         assert len(outputs) == 3
         assert "test1" in outputs[0]
         assert "test2" in outputs[1]
         assert "admin" in outputs[2]
-        
-        await driver.disconnect()
 
 
+@pytest.mark.asyncio(loop_scope="session")
 class TestFileTransfer:
     """Test file transfer functionality."""
     
-    @pytest.mark.asyncio
     async def test_send_file(self, board_simulator):
         """Test file transfer to board."""
         config = TelnetConfig(
@@ -360,7 +360,6 @@ class TestFileTransfer:
             os.unlink(local_path)
             await driver.disconnect()
     
-    @pytest.mark.asyncio
     async def test_read_file(self, board_simulator):
         """Test file reading from board."""
         config = TelnetConfig(
@@ -385,34 +384,16 @@ class TestFileTransfer:
         await driver.disconnect()
 
 
+@pytest.mark.asyncio(loop_scope="session")
 class TestConnectionManagement:
     """Test connection management features."""
     
-    @pytest.mark.asyncio
-    async def test_is_alive(self, mock_server):
-        """Test connection liveness check."""
-        config = TelnetConfig(
-            host="127.0.0.1",
-            port=mock_server.port,
-            username="admin",
-            password="password"
-        )
-        driver = TelnetDriver(config)
-        
-        # Not connected
-        assert await driver.is_alive() is False
-        
-        # Connected
-        await driver.connect()
-        assert await driver.is_alive() is True
-        
-        # Disconnected
-        await driver.disconnect()
-        assert await driver.is_alive() is False
+    async def test_is_alive_not_connected(self, telnet_driver):
+        """Test liveness check before any connection is made."""
+        assert await telnet_driver.is_alive() is False
     
-    @pytest.mark.asyncio
     async def test_context_manager(self, mock_server):
-        """Test async context manager."""
+        """Test async context manager and liveness across one connection."""
         config = TelnetConfig(
             host="127.0.0.1",
             port=mock_server.port,
@@ -422,25 +403,18 @@ class TestConnectionManagement:
         
         async with TelnetDriver(config) as driver:
             assert driver.state == ConnectionState.AUTHENTICATED
+            assert await driver.is_alive() is True
             
             output = await driver.execute_command("echo test")
             assert "test" in output
         
         # Should be disconnected after context
         assert driver.state == ConnectionState.DISCONNECTED
+        assert await driver.is_alive() is False
     
-    @pytest.mark.asyncio
-    async def test_command_history(self, mock_server):
+    async def test_command_history(self, connected_driver):
         """Test command history management."""
-        config = TelnetConfig(
-            host="127.0.0.1",
-            port=mock_server.port,
-            username="admin",
-            password="password"
-        )
-        driver = TelnetDriver(config)
-        
-        await driver.connect()
+        driver = connected_driver
         
         # Execute commands
         await driver.execute_command("echo test1")
@@ -457,180 +431,81 @@ class TestConnectionManagement:
         # Clear history
         driver.clear_history()
         assert len(driver.get_command_history()) == 0
-        
-        await driver.disconnect()
 
 
+@pytest.mark.asyncio(loop_scope="session")
 class TestBoardSimulator:
     """Test with board simulator for realistic scenarios."""
     
-    @pytest.mark.asyncio
-    async def test_test_execution(self, board_simulator):
+    async def test_test_execution(self, board_driver):
         """Test simulated test execution."""
-        config = TelnetConfig(
-            host="127.0.0.1",
-            port=board_simulator.port,
-            username="test",
-            password="test123"
-        )
-        driver = TelnetDriver(config)
-        
-        await driver.connect()
-        
         # Execute test
-        output = await driver.execute_command("./test_binary")
+        output = await board_driver.execute_command("./test_binary")
         
         assert "Starting test" in output
         assert "PASS" in output
         assert "All tests completed successfully" in output
-        
-        await driver.disconnect()
     
-    @pytest.mark.asyncio
-    async def test_process_management(self, board_simulator):
+    async def test_process_management(self, board_driver):
         """Test process listing and management."""
-        config = TelnetConfig(
-            host="127.0.0.1",
-            port=board_simulator.port,
-            username="test",
-            password="test123"
-        )
-        driver = TelnetDriver(config)
-        
-        await driver.connect()
-        
         # List processes
-        output = await driver.execute_command("ps aux")
+        output = await board_driver.execute_command("ps aux")
         assert "PID" in output
         assert "/sbin/init" in output
         
         # Simulate running process
-        await driver.execute_command("./long_test &")
+        await board_driver.execute_command("./long_test &")
         
         # Check if process appears
-        output = await driver.execute_command("ps aux")
+        output = await board_driver.execute_command("ps aux")
         # Note: Our mock doesn't handle background processes perfectly
-        
-        await driver.disconnect()
     
-    @pytest.mark.asyncio
-    async def test_system_info(self, board_simulator):
+    @pytest.mark.parametrize("command", list(SYSTEM_INFO))
+    async def test_system_info(self, system_info_outputs, command):
         """Test system information retrieval."""
-        config = TelnetConfig(
-            host="127.0.0.1",
-            port=board_simulator.port,
-            username="test",
-            password="test123"
-        )
-        driver = TelnetDriver(config)
-        
-        await driver.connect()
-        
-        # Get system info
-        uname = await driver.execute_command("uname -a")
-        assert "Linux" in uname
-        assert "mock-board" in uname
-        
-        # Get CPU info
-        cpuinfo = await driver.execute_command("cat /proc/cpuinfo")
-        assert "processor" in cpuinfo
-        assert "Mock CPU" in cpuinfo
-        
-        # Get memory info
-        meminfo = await driver.execute_command("free -m")
-        assert "Mem:" in meminfo
-        assert "2048" in meminfo
-        
-        # Get disk info
-        diskinfo = await driver.execute_command("df -h")
-        assert "Filesystem" in diskinfo
-        assert "/dev/root" in diskinfo
-        
-        await driver.disconnect()
+        found = set(_SYSTEM_INFO_RE[command].findall(system_info_outputs[command]))
+        assert set(SYSTEM_INFO[command]) <= found
 
 
+@pytest.mark.asyncio(loop_scope="session")
 class TestErrorHandling:
     """Test error handling scenarios."""
     
-    @pytest.mark.asyncio
-    async def test_login_failure_wrong_username(self):
-        """Test login failure with wrong username."""
-        port = random.randint(40001, 50000)
-        server = MockTelnetServer(
-            host="127.0.0.1",
-            port=port,
-            username="admin",
-            password="password"
-        )
-        await server.start_background()
-        
+    @pytest.mark.parametrize("username,password", [
+        ("wrong", "password"),
+        ("admin", "wrong"),
+    ], ids=["wrong-username", "wrong-password"])
+    async def test_login_failure(self, mock_server, username, password):
+        """Test login failure with a wrong username or password."""
         config = TelnetConfig(
             host="127.0.0.1",
-            port=port,
-            username="wrong",
-            password="password",
+            port=mock_server.port,
+            username=username,
+            password=password,
             timeout=2
         )
         driver = TelnetDriver(config)
         
-        try:
-            with pytest.raises(TelnetConnectionError) as exc_info:
-                await driver.connect()
-            
-            assert "Login" in str(exc_info.value) or "timeout" in str(exc_info.value)
-        finally:
-            await server.stop()
-    
-    @pytest.mark.asyncio
-    async def test_login_failure_wrong_password(self):
-        """Test login failure with wrong password."""
-        port = random.randint(50001, 60000)
-        server = MockTelnetServer(
-            host="127.0.0.1",
-            port=port,
-            username="admin",
-            password="password"
-        )
-        await server.start_background()
-        
-        config = TelnetConfig(
-            host="127.0.0.1",
-            port=port,
-            username="admin",
-            password="wrong",
-            timeout=2
-        )
-        driver = TelnetDriver(config)
+        with pytest.raises(TelnetConnectionError) as exc_info:
+            await driver.connect()
         
-        try:
-            with pytest.raises(TelnetConnectionError) as exc_info:
-                await driver.connect()
-            
-            assert "Login" in str(exc_info.value) or "timeout" in str(exc_info.value)
-        finally:
-            await server.stop()
+        assert "Login" in str(exc_info.value) or "timeout" in str(exc_info.value)
     
-    @pytest.mark.asyncio
-    async def test_retry_logic(self):
+    async def test_retry_logic(self, virtual_clock):
         """Test connection retry logic."""
         config = TelnetConfig(
             host="127.0.0.1",
-            port=9998,  # Non-existent port
+            port=unused_port(),  # Nothing listening
             connect_timeout=0.5,
             retry_count=3,
             retry_delay=0.1
         )
         driver = TelnetDriver(config)
         
-        import time
-        start = time.time()
-        
         with pytest.raises(TelnetConnectionError) as exc_info:
             await driver.connect()
         
-        elapsed = time.time() - start
-        
         # Should have retried 3 times
         assert "after 3 attempts" in str(exc_info.value)
-        # Should have taken at least retry_delay * 2 (between retries)
-        assert elapsed >= 0.2
\ No newline at end of file
+        # One retry_delay between each pair of attempts, in virtual time
+        assert virtual_clock.now == pytest.approx(0.2)
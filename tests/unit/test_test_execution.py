@@ -0,0 +1,122 @@
+"""Unit tests for the test execution flow and tasks."""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from src.flows import test_execution as flow_module
+from src.tasks import test_tasks as tasks_module
+
+
+BOARD_IDS = ["soc-a-001", "soc-a-002", "soc-b-001"]
+
+
+def passed_result(board_id, test_binary):
+    """Result execute_test reports for a passing run."""
+    return {"status": "passed", "board_id": board_id, "test_binary": test_binary}
+
+
+@pytest.fixture
+def flow_tasks(monkeypatch):
+    """Replace the flow's tasks and run logger; every board transfers and passes by default."""
+    transfer = AsyncMock(return_value=True)
+    execute = AsyncMock(
+        side_effect=lambda board_id, test_binary, timeout: passed_result(board_id, test_binary)
+    )
+    monkeypatch.setattr(flow_module, "transfer_test_binary", transfer)
+    monkeypatch.setattr(flow_module, "execute_test", execute)
+    monkeypatch.setattr(flow_module, "get_run_logger", MagicMock())
+    return transfer, execute
+
+
+class TestMultiBoardTestFlow:
+    """Test multi_board_test_flow."""
+    
+    async def test_boards_run_concurrently(self, flow_tasks):
+        """Test every board's transfer is in flight before any finishes."""
+        transfer, _ = flow_tasks
+        in_flight = 0
+        peak = 0
+        
+        async def slow_transfer(board_id, test_binary):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0)
+            in_flight -= 1
+            return True
+        
+        transfer.side_effect = slow_transfer
+        
+        await flow_module.multi_board_test_flow.fn("/tmp/test_bin", BOARD_IDS)
+        
+        assert peak == len(BOARD_IDS)
+    
+    async def test_results_in_board_order(self, flow_tasks):
+        """Test results follow board_ids even when later boards finish first."""
+        _, execute = flow_tasks
+        
+        async def execute_in_reverse(board_id, test_binary, timeout):
+            # Earlier boards yield more often, so they complete last
+            for _ in range(len(BOARD_IDS) - BOARD_IDS.index(board_id)):
+                await asyncio.sleep(0)
+            return passed_result(board_id, test_binary)
+        
+        execute.side_effect = execute_in_reverse
+        
+        results = await flow_module.multi_board_test_flow.fn("/tmp/test_bin", BOARD_IDS)
+        
+        assert [result["board_id"] for result in results] == BOARD_IDS
+    
+    async def test_transfer_failure(self, flow_tasks):
+        """Test a failed transfer skips execution and fails only that board."""
+        transfer, execute = flow_tasks
+        transfer.side_effect = lambda board_id, test_binary: board_id != "soc-a-002"
+        
+        results = await flow_module.multi_board_test_flow.fn("/tmp/test_bin", BOARD_IDS, timeout=60)
+        
+        assert results[1] == {
+            "status": "failed",
+            "board_id": "soc-a-002",
+            "test_binary": "/tmp/test_bin",
+            "error_message": "Test binary transfer failed"
+        }
+        assert [results[0]["status"], results[2]["status"]] == ["passed", "passed"]
+        assert [call.args for call in execute.await_args_list] == [
+            ("soc-a-001", "/tmp/test_bin", 60),
+            ("soc-b-001", "/tmp/test_bin", 60)
+        ]
+
+
+class TestSimulateDelay:
+    """Test the SOC_SIMULATE-gated task delay."""
+    
+    async def test_skipped_without_soc_simulate(self, monkeypatch):
+        """Test no sleep happens when SOC_SIMULATE is unset."""
+        monkeypatch.delenv("SOC_SIMULATE", raising=False)
+        sleep = AsyncMock()
+        monkeypatch.setattr(tasks_module.asyncio, "sleep", sleep)
+        
+        await tasks_module._simulate_delay(2)
+        
+        sleep.assert_not_awaited()
+    
+    async def test_sleeps_with_soc_simulate(self, monkeypatch):
+        """Test the delay is slept when SOC_SIMULATE is set."""
+        monkeypatch.setenv("SOC_SIMULATE", "1")
+        sleep = AsyncMock()
+        monkeypatch.setattr(tasks_module.asyncio, "sleep", sleep)
+        
+        await tasks_module._simulate_delay(2)
+        
+        sleep.assert_awaited_once_with(2)
+    
+    async def test_transfer_returns_without_delay(self, monkeypatch):
+        """Test transfer_test_binary completes without sleeping by default."""
+        monkeypatch.delenv("SOC_SIMULATE", raising=False)
+        sleep = AsyncMock()
+        monkeypatch.setattr(tasks_module.asyncio, "sleep", sleep)
+        monkeypatch.setattr(tasks_module, "get_run_logger", MagicMock())
+        
+        assert await tasks_module.transfer_test_binary.fn("soc-a-001", "/tmp/test_bin") is True
+        sleep.assert_not_awaited()